@@ -2,14 +2,53 @@
 checks.py: contains ItemChecker class for evaluating an item's metadata, etc and determining needed fixes.
 """
 
-import json
-from collections import namedtuple
+import functools
+import re
+import threading
+import unicodedata
+from collections import Counter, namedtuple
 from pathlib import Path
 
 import arcgis
 import arcpy
 
+#: arcpy isn't thread-safe; hold this lock for any arcpy calls made while items are checked in worker threads
+ARCPY_LOCK = threading.Lock()
 
+#: Translation table for stripping periods from tag words
+_DROP_PERIODS = str.maketrans("", "", ".")
+
+
+def _normalize(text):
+    """
+    Return the NFKC-normalized form of text so that strings that only differ in their unicode representation (composed
+    vs decomposed accents, full-width characters, etc) compare as equal instead of triggering an unneeded fix.
+    """
+
+    return unicodedata.normalize("NFKC", text)
+
+
+@functools.lru_cache(maxsize=4096)
+def _case_word(cleaned_word, uppercased, articles):
+    """
+    Return the properly-cased version of a single word (see tag_case()).
+    Memoized because most orgs reuse a small vocabulary of tag words across
+    all their items; uppercased and articles must be hashable (frozensets).
+    """
+
+    word_lower = cleaned_word.lower()
+
+    #: Upper case specified words:
+    if word_lower in uppercased:
+        return cleaned_word.upper()
+    #: Lower case articles/conjunctions
+    if word_lower in articles:
+        return word_lower
+    #: Title case everything else
+    return cleaned_word.title()
+
+
+@functools.lru_cache(maxsize=8192)
 def tag_case(tag, uppercased, articles):
     """
     Changes a tag to the correct title case while also removing any periods:
@@ -21,42 +60,59 @@ def tag_case(tag, uppercased, articles):
     Note: No check is done for articles at the beginning of a tag; all articles
     will be lowercased.
 
+    Results are memoized per tag (and per word via _case_word()) because the
+    same tags recur across an org's items, so all arguments must be hashable.
+
     tag:        The single or multi-word tag to check
-    uppercased: Lower-cased list of words that should be uppercased (must be
-                lower-cased to facilitate checking)
-    articles:   Lower-cased list of words that should always be lower-cased:
-                'in', 'of', etc
+    uppercased: Lower-cased frozenset of words that should be uppercased (must
+                be lower-cased to facilitate checking)
+    articles:   Lower-cased frozenset of words that should always be
+                lower-cased: 'in', 'of', etc
     """
 
+    #: Most tags are a single plain word; case it directly without splitting and re-joining
+    if tag.isalnum():
+        return _case_word(tag, uppercased, articles)
+
     new_words = []
     for word in tag.split():
-        cleaned_word = word.replace(".", "")
-
-        #: Upper case specified words:
-        if cleaned_word.lower() in uppercased:
-            new_words.append(cleaned_word.upper())
-        #: Lower case articles/conjunctions
-        elif cleaned_word.lower() in articles:
-            new_words.append(cleaned_word.lower())
-        #: Title case everything else
-        else:
-            new_words.append(cleaned_word.title())
+        #: Most words don't have periods; skip building a new string for them
+        if "." in word:
+            word = word.translate(_DROP_PERIODS)
+        new_words.append(_case_word(word, uppercased, articles))
 
     return " ".join(new_words)
 
 
+#: The parts of a feature class's metadata used by the checks and fixes, as plain strings
+FCMetadata = namedtuple("FCMetadata", ["xml", "tags"])
+
+
+@functools.lru_cache(maxsize=256)
+def get_fc_metadata(fc_path):
+    """
+    Return the xml and tags of the metadata for the feature class at fc_path as
+    an FCMetadata. Memoized so the metadata check and fix for an item (or items
+    sharing a feature class) parse the feature class's metadata only once. Only
+    the strings are cached; the arcpy Metadata object is created and discarded
+    here so worker threads never share one. Callers must hold ARCPY_LOCK.
+    """
+
+    metadata = arcpy.metadata.Metadata(fc_path)
+    return FCMetadata(metadata.xml, metadata.tags)
+
+
 def get_group_from_table(metatable_dict_entry):
     """
     Return the appropriate group title based on either the SGID table name or
-    the shelved category.
+    the shelved category of a models.MetaRow.
     """
 
-    sgid_name, _, item_category, _ = metatable_dict_entry
-
-    if item_category == "shelved":
+    if metatable_dict_entry.category == "shelved":
         group = "UGRC Shelf"
     else:
-        table_category = sgid_name.split(".")[1].title()
+        #: SGID.<CATEGORY>.<Table>; partition avoids splitting off the table name we don't need
+        table_category = metatable_dict_entry.sgid_name.partition(".")[2].partition(".")[0].title()
         group = f"Utah SGID {table_category}"
 
     return group
@@ -128,10 +184,12 @@ class ItemChecker:
         self.item = get_item_properties(item)
         self.metatable_dict = metatable_dict
 
-        #: Get the REST properties object once
+        #: Get the REST properties object once. manager.properties is a PropertyMap (a dict subclass), so it can be
+        #: used directly instead of round-tripping it through str() and json.loads().
+        #: Built from the original Item; fromitem() can't use the ItemProperties namedtuple.
         try:
-            manager = arcgis.features.FeatureLayerCollection.fromitem(self.item).manager
-            self.properties = json.loads(str(manager.properties))
+            manager = arcgis.features.FeatureLayerCollection.fromitem(item).manager
+            self.properties = manager.properties
         except Exception:
             self.properties = None
 
@@ -146,7 +204,6 @@ class ItemChecker:
         self.in_sgid = False
         self.title_from_metatable = None
         self.new_group = None
-        self.arcpy_metadata = None
         self.feature_class_path = None
         self.new_folder = None
         self.authoritative = ""
@@ -159,35 +216,61 @@ class ItemChecker:
         sde_path:   Path to the SDE database. Joined with the feature class
                     name obtained from the metatable.
         """
+        #: Look up the item's metatable entry once; None if it's not in the table
+        metatable_entry = self.metatable_dict.get(self.item.itemid)
+
         #: Get title, group from metatable if it's in the table
-        if self.item.itemid in self.metatable_dict:
+        if metatable_entry is not None:
+            self.title_from_metatable = metatable_entry.agol_name
             self.in_sgid = True
-            self.title_from_metatable = self.metatable_dict[self.item.itemid][1]
-            self.new_group = get_group_from_table(self.metatable_dict[self.item.itemid])
-            if self.metatable_dict[self.item.itemid][3]:
-                if self.metatable_dict[self.item.itemid][3].casefold() == "y":
+            self.new_group = get_group_from_table(metatable_entry)
+            if metatable_entry.authoritative:
+                if metatable_entry.authoritative.casefold() == "y":
                     self.authoritative = "public_authoritative"
-                elif self.metatable_dict[self.item.itemid][3].casefold() == "d":
+                elif metatable_entry.authoritative.casefold() == "d":
                     self.authoritative = "deprecated"
 
-            feature_class_name = self.metatable_dict[self.item.itemid][0]
-            self.results_dict["SGID_Name"] = feature_class_name
-            self.feature_class_path = Path(sde_path, feature_class_name)
-            if arcpy.Exists(str(self.feature_class_path)):
-                self.arcpy_metadata = arcpy.metadata.Metadata(str(self.feature_class_path))
+            self.results_dict["SGID_Name"] = metatable_entry.sgid_name
+            self.feature_class_path = Path(sde_path, metatable_entry.sgid_name)
 
         #: Get folder from SGID category if it's in the table
         if self.new_group == "UGRC Shelf":
             self.new_folder = "UGRC_Shelved"
         elif self.new_group:
-            self.new_folder = self.new_group.split("Utah SGID ")[-1]
+            self.new_folder = self.new_group.removeprefix("Utah SGID ")
 
         #: Set static/shelved flag
         if self.new_group == "UGRC Shelf":
             self.static_shelved = "shelved"
-        elif self.in_sgid and self.metatable_dict[self.item.itemid][2] == "static":
+        elif metatable_entry is not None and metatable_entry.category == "static":
             self.static_shelved = "static"
 
+    @functools.cached_property
+    def fc_metadata(self):
+        """
+        The feature class's metadata as an FCMetadata, or None if the item isn't in the SGID or its feature class
+        doesn't exist. Read on first use (after setup()) rather than for every item, since it's expensive to read.
+        """
+
+        if not self.feature_class_path:
+            return None
+
+        with ARCPY_LOCK:
+            if not arcpy.Exists(str(self.feature_class_path)):
+                return None
+            return get_fc_metadata(str(self.feature_class_path))
+
+    @functools.cached_property
+    def metadata_tags(self):
+        """
+        List of the tags from the feature class's metadata, parsed once for tags_check().
+        """
+
+        if not self.fc_metadata or not self.fc_metadata.tags:
+            return []
+
+        return [t.strip() for t in self.fc_metadata.tags.split(", ") if t.strip()]
+
     def tags_check(self, tags_to_delete, uppercased_tags, articles):
         """
         Create a list of new, cleaned tags:
@@ -195,47 +278,62 @@ class ItemChecker:
             * Delete any tags in tags_to_delete
             * Add SGID category tag and SGID, UGRC if it's an SGID item
 
+        tags_to_delete, uppercased_tags, and articles should be lower-cased
+        sets (see the Auditor class attributes) so membership tests are cheap.
+
         Update results_dict with results for this item:
                 {'tags_fix':'', 'tags_old':'', 'tags_new':''}
         """
 
-        #: Use existing title unless we have one from metatable
-        if self.title_from_metatable:
-            title = self.title_from_metatable
-        else:
-            title = self.item.title
+        #: Bind the item's tags once; they're read again when building the report
+        item_tags = self.item.tags
+
+        #: Use existing title unless we have one from metatable. Normalized only for matching tags against it; the
+        #: tags themselves keep their original text so a fix doesn't rewrite characters like '™' or '₂'.
+        title = _normalize(self.title_from_metatable or self.item.title)
 
         #: Strip off any leading/trailing whitespace
-        orig_tags = [t.strip() for t in self.item.tags if t.strip()]
+        orig_tags = [t.strip() for t in item_tags if t.strip()]
+
+        #: Add any tags in the metadata (parsed in setup()) to list of tags to evaluate
+        orig_tags.extend(self.metadata_tags)
 
-        #: Add any tags in the metadata to list of tags to evaluate
-        if self.arcpy_metadata and self.arcpy_metadata.tags:
-            orig_tags.extend([t.strip() for t in self.arcpy_metadata.tags.split(", ") if t.strip()])
+        #: Split the title once rather than for every tag
+        title_words = set(title.split())
+        title_words_lower = {word.lower() for word in title_words}
+
+        #: Multi-word tags that appear in the title as whole words, found in one pass before the loop
+        multi_word_tags_in_title = {
+            tag for tag in orig_tags if " " in tag and re.search(rf"(?<!\w){re.escape(_normalize(tag))}(?!\w)", title)
+        }
+
+        #: Build the new tags in a dict used as an insertion-ordered set so the membership tests and removals below
+        #: don't have to scan a list. Converted back to self.new_tags at the end.
+        new_tags = dict.fromkeys(self.new_tags)
 
         #: Evaluate existing tags
         for orig_tag in orig_tags:
 
             #: Check if the tag is in the title (checking orig_tag instead
-            #: of cleaned_tag to avoid weird false positives in multi-word
-            #: tags catching the middle of a title- ie, 'Cycle Net' would
-            #: match the title 'Bicycle Network'. Probably not super
-            #: common, but oh well.)
+            #: of cleaned_tag, and only matching whole words so multi-word
+            #: tags don't catch the middle of a title- ie, 'Cycle Net'
+            #: shouldn't match the title 'Bicycle Network'.)
             #: These combine several boolean checks into a single variable
             #: to be checked later.
 
+            #: operate on lower case to fix any weird mis-cased tags; computed once and reused by every check below
+            lowercase_tag = orig_tag.lower()
+
             #: single-word tag in title
             #: Safe to use lower case for single-word tags
             single_word_tag_in_title = False
-            if orig_tag.lower() in title.lower().split():
+            if _normalize(lowercase_tag) in title_words_lower:
                 single_word_tag_in_title = True
             #: multi-word tag in title
             multi_word_tag_in_title = False
-            if " " in orig_tag and orig_tag in title:
+            if orig_tag in multi_word_tags_in_title:
                 multi_word_tag_in_title = True
 
-            #: operate on lower case to fix any weird mis-cased tags
-            lowercase_tag = orig_tag.lower()
-
             #: Run checks on existing tags. A check that modifies the tag should
             #: append it to new_tags. A check that removes unwanted tags
             #: should just pass. If a tag passes all the checks, it gets
@@ -244,8 +342,8 @@ class ItemChecker:
             #: Fix/keep 'Utah' if it's not in the title
             if lowercase_tag == "utah":
                 #: Have to nest this to avoid 'utah' hitting else and being added
-                if "Utah" not in title.split():
-                    self.new_tags.append("Utah")
+                if "Utah" not in title_words:
+                    new_tags.setdefault("Utah")
             #: Don't add to new_tags if it should be deleted
             elif lowercase_tag in tags_to_delete:
                 pass
@@ -254,45 +352,47 @@ class ItemChecker:
                 pass
             #: Otherwise, add the tag (properly-cased)
             else:
-                cased_tag = tag_case(orig_tag, uppercased_tags, articles)
-                if cased_tag not in self.new_tags:
-                    self.new_tags.append(cased_tag)
+                #: Casing only depends on the lower-cased words, so this also keeps tag_case's cache keys uniform
+                cased_tag = tag_case(lowercase_tag, uppercased_tags, articles)
+                new_tags.setdefault(cased_tag)
 
         #: Check the category tag. If it doesn't exist, set to None
         group_tag = None
         if self.static_shelved == "shelved":
             group_tag = "Shelved"
         elif self.new_group:
-            group_tag = self.new_group.split("Utah SGID ")[-1]
+            group_tag = self.new_group.removeprefix("Utah SGID ")
 
         if group_tag:
             #: If there's already a lowercase tag for the category, replace it
-            if group_tag.lower() in self.new_tags:
-                self.new_tags.remove(group_tag.lower())
-                self.new_tags.append(group_tag)
+            if group_tag.lower() in new_tags:
+                del new_tags[group_tag.lower()]
+                new_tags[group_tag] = None
             #: Otherwise add if its not in list already
-            elif group_tag not in self.new_tags:
-                self.new_tags.append(group_tag)
+            else:
+                new_tags.setdefault(group_tag)
+
+            #: Make sure it's got SGID, UGRC in it's tags
+            required_tags = ["SGID", "UGRC"]
 
             #: Static items should be tagged 'Static'
             if self.static_shelved == "static":
-                if "Static" not in self.new_tags:
-                    self.new_tags.append("Static")
-                if "Shelved" in self.new_tags:
-                    self.new_tags.remove("Shelved")
+                required_tags.insert(0, "Static")
+                new_tags.pop("Shelved", None)
 
-            #: Make sure it's got SGID, UGRC in it's tags
-            if "SGID" not in self.new_tags:
-                self.new_tags.append("SGID")
-            if "UGRC" not in self.new_tags:
-                self.new_tags.append("UGRC")
+            #: Existing keys keep their position; missing ones are appended in order
+            new_tags.update(dict.fromkeys(required_tags))
+
+        self.new_tags = list(new_tags)
 
         #: Create tags data: tags_fix, tags_old, tags_new
         #: Report existing tags for troubleshooting why some items don't seem to be checked during weekly run.
-        tags_data = {"tags_fix": "N", "tags_old": self.item.tags, "tags_new": ""}
+        tags_data = {"tags_fix": "N", "tags_old": item_tags, "tags_new": ""}
 
-        if sorted(self.new_tags) != sorted(self.item.tags):
-            tags_data = {"tags_fix": "Y", "tags_old": self.item.tags, "tags_new": self.new_tags}
+        #: Order doesn't matter, but duplicate tags do, so compare counts rather than sorting both lists. Compare the
+        #: normalized forms so tags that only differ in their unicode representation don't trigger a fix.
+        if Counter(_normalize(t) for t in self.new_tags) != Counter(_normalize(t) for t in item_tags):
+            tags_data = {"tags_fix": "Y", "tags_old": item_tags, "tags_new": self.new_tags}
 
         self.results_dict.update(tags_data)
 
@@ -304,29 +404,31 @@ class ItemChecker:
                 {'title_fix':'', 'title_old':'', 'title_new':''}
         """
 
+        item_title = self.item.title
+
         #: Create title data: title_fix, title_old, title_new
         #: Always include the old title for readability
-        title_data = {"title_fix": "N", "title_old": self.item.title, "title_new": ""}
+        title_data = {"title_fix": "N", "title_old": item_title, "title_new": ""}
 
         #: Will be updated from metatable and/or deprecated check.
-        new_title = self.item.title
+        new_title = item_title
 
         #: Existing title with {Deprecated} removed if necessary
-        existing_title = self.item.title
-        if self.item.title.startswith("{Deprecated} "):
-            existing_title = self.item.title.split(" ", 1)[-1]
+        existing_title = item_title
+        if item_title.startswith("{Deprecated} "):
+            existing_title = item_title.split(" ", 1)[-1]
 
         #: Check to see if title needs updating from metatable, taking into account the metatable title
         #: won't have {Deprecated} at the front
-        if self.title_from_metatable and self.title_from_metatable != existing_title:
+        if self.title_from_metatable and _normalize(self.title_from_metatable) != _normalize(existing_title):
             new_title = self.title_from_metatable
-            title_data = {"title_fix": "Y", "title_old": self.item.title, "title_new": new_title}
+            title_data = {"title_fix": "Y", "title_old": item_title, "title_new": new_title}
 
         #: Add {Deprecated} if necessary
         #: new_title will have been modified from previous step if necessary
         if self.authoritative == "deprecated" and "deprecated" not in new_title.casefold():
             new_title = "{Deprecated} " + new_title
-            title_data = {"title_fix": "Y", "title_old": self.item.title, "title_new": new_title}
+            title_data = {"title_fix": "Y", "title_old": item_title, "title_new": new_title}
 
         self.results_dict.update(title_data)
 
@@ -349,27 +451,39 @@ class ItemChecker:
 
         self.results_dict.update(folder_data)
 
-    def groups_check(self):
+    def groups_check(self, groups_dict):
         """
         Check item's group against SGID category from metatable.
 
+        groups_dict:    A mapping of all the org's casefolded group titles to
+                        their Group objects.
+
         Update results_dict with results for this item:
                 {'groups_fix':'', 'groups_old':'', 'group_new':''}
         """
 
-        #: Get current group, wrapped in try/except for groups that error out
-        try:
-            current_groups = [group.title for group in self.item.shared_with["groups"]]
-        except Exception:
-            current_groups = ["Error"]
+        #: The sharing lookup is done once in __init__; if it raised, the exception is stored in place of the sharing
+        #: info. Report the failure directly rather than through a placeholder group name, which would collide with a
+        #: real group called "Error".
+        shared_with = self.item.shared_with
+        if isinstance(shared_with, Exception):
+            self.results_dict.update({"groups_fix": "N", "groups_old": "Can't get group", "group_new": ""})
+            return
+
+        current_groups = [group.title for group in (shared_with or {}).get("groups") or []]
 
         #: Create groups data: groups_fix, groups_old, group_new
         groups_data = {"groups_fix": "N", "groups_old": "", "group_new": ""}
 
-        if current_groups and current_groups[0].casefold() == "error":
-            groups_data = {"groups_fix": "N", "groups_old": "Can't get group", "group_new": ""}
-        elif self.new_group and self.new_group not in current_groups:
-            groups_data = {"groups_fix": "Y", "groups_old": current_groups, "group_new": self.new_group}
+        #: Compare against the org group's actual title so a metatable category that only differs from it by case isn't
+        #: flagged (and re-shared) on every run. Keep the metatable's name if the org doesn't have the group so the fix
+        #: can report it.
+        new_group = self.new_group
+        if new_group and new_group.casefold() in groups_dict:
+            new_group = groups_dict[new_group.casefold()].title
+
+        if new_group and new_group not in current_groups:
+            groups_data = {"groups_fix": "Y", "groups_old": current_groups, "group_new": new_group}
 
         self.results_dict.update(groups_data)
 
@@ -378,22 +492,26 @@ class ItemChecker:
         Make sure item's 'Allow others to export to different formats' box is checked
 
         Update results_dict with results for this item:
-                {'downloads_fix':''}
-        """
+                {'downloads_fix':'', 'downloads_old':'', 'downloads_new':''}
 
-        #: Check if downloads enabled; wrap in try/except for robustness
-        try:
-            manager = arcgis.features.FeatureLayerCollection.fromitem(self.item).manager
-            properties = json.loads(str(manager.properties))
-        except Exception:
-            properties = None
+        The old and new capabilities strings are passed along so downloads_fix
+        doesn't have to fetch the service's properties again.
+        """
 
-        #: Create protect data: downloads_fix
-        fix_downloads = {"downloads_fix": "N"}
+        #: Create downloads data: downloads_fix, downloads_old, downloads_new
+        fix_downloads = {"downloads_fix": "N", "downloads_old": "", "downloads_new": ""}
 
-        if self.in_sgid and properties and "Extract" not in properties["capabilities"]:
-            self.downloads = True
-            fix_downloads = {"downloads_fix": "Y"}
+        #: Use the REST properties fetched in __init__ rather than building another FeatureLayerCollection
+        if self.in_sgid and self.properties:
+            current_capabilities = self.properties["capabilities"]
+            capabilities = {capability.strip() for capability in current_capabilities.split(",")}
+            if "Extract" not in capabilities:
+                self.downloads = True
+                fix_downloads = {
+                    "downloads_fix": "Y",
+                    "downloads_old": current_capabilities,
+                    "downloads_new": current_capabilities + ",Extract",
+                }
 
         self.results_dict.update(fix_downloads)
 
@@ -434,7 +552,8 @@ class ItemChecker:
             "metadata_note": "",
         }
 
-        if self.arcpy_metadata and self.arcpy_metadata.xml != self.item.metadata:
+        #: fc_metadata holds plain strings read under ARCPY_LOCK, so comparing them doesn't need the lock
+        if self.fc_metadata and self.fc_metadata.xml != self.item.metadata:
             metadata_data = {
                 "metadata_fix": "Y",
                 "metadata_old": "item.metadata from AGOL not shown due to length",
@@ -442,10 +561,11 @@ class ItemChecker:
                 "metadata_note": "",
             }
 
-            # Update flag for description note for shelved/static data
+            # Update flag for description note for shelved/static data. static_shelved was set from the item's
+            # metatable entry in setup(), so there's no need to look the entry up again.
             if self.new_group == "UGRC Shelf":
                 metadata_data["metadata_note"] = "shelved"
-            elif self.metatable_dict[self.item.itemid][2] == "static":
+            elif self.static_shelved == "static":
                 metadata_data["metadata_note"] = "static"
 
         self.results_dict.update(metadata_data)
@@ -529,15 +649,18 @@ class ItemChecker:
 
         for layer in self.item.layers:
 
-            #: Check if default vis is true; wrap in try/except for robustness
+            #: Check if default vis is true; wrap in try/except for robustness. The PropertyMap is a dict, so use it
+            #: directly rather than round-tripping it through json.
             properties = None
             try:
-                properties = json.loads(str(layer.manager.properties))
+                properties = layer.manager.properties
             except Exception:
                 pass
 
             if properties and not properties["defaultVisibility"]:
                 self.set_visibility = True
+                #: One hidden layer is enough; don't fetch the rest of the layers' properties
+                break
 
         if self.set_visibility:
             fix_visibility["visibility_fix"] = "Y"
@@ -553,7 +676,7 @@ class ItemChecker:
                 {'cache_age_fix':'', 'cache_age_old':'', 'cache_age_new:''}
         """
 
-        #: Create protect data: downloads_fix
+        #: Create cache age data: cache_age_fix, cache_age_old, cache_age_new
         fix_cache_age = {"cache_age_fix": "N", "cache_age_old": "", "cache_age_new": ""}
 
         if self.in_sgid and self.properties:
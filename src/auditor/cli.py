@@ -2,7 +2,7 @@
 auditor
 
 Usage:
-    auditor spot [--save_report --dry --verbose ITEM ...]
+    auditor spot [--save_report --dry --verbose --workers=N ITEM ...]
     auditor scheduled
 
 Options:
@@ -10,11 +10,13 @@ Options:
     -r, --save_report           Save report to the file specified in the credentials file (will be rotated)
     -d, --dry                   Only run the checks, don't do any fixes [default: False]
     -v, --verbose               Print status updates to the console [default: False]
+    -w N, --workers=N           Number of items to check or fix at the same time [default: 8]
     ITEM                        One or more AGOL item IDs to audit. If none are specified, all items are audited.
 
 Examples:
     auditor spot -r -v
     auditor spot -v -r aaaaaaaabbbbccccddddeeeeeeeeeeee
+    auditor spot -v -w 16
     auditor scheduled
 """
 
@@ -32,12 +34,27 @@ from supervisor.models import MessageDetails, Supervisor
 from auditor.models import Auditor, credentials
 
 
+def _parse_workers(workers):
+    """Return the --workers value as an int; raise DocoptExit if it isn't a positive whole number"""
+
+    try:
+        workers = int(workers)
+    except ValueError:
+        raise DocoptExit() from None
+
+    if workers < 1:
+        raise DocoptExit()
+
+    return workers
+
+
 def cli():
     """Main entry point for auditor; parses args using docopt"""
 
     #: try/except/else to print help if bad input received
     try:
         args = docopt(__doc__, version="1.0")
+        args["--workers"] = _parse_workers(args["--workers"])
     except DocoptExit:
         print("\n*** Invalid input ***\n")
         print(__doc__)
@@ -61,7 +78,7 @@ def cli():
                 summary_logger.addHandler(cli_handler)
 
             #: Set up org, check & fix items
-            org_auditor = Auditor(summary_logger, args["--verbose"], args["ITEM"])
+            org_auditor = Auditor(summary_logger, args["--verbose"], args["ITEM"], args["--workers"])
             if args["--dry"]:
                 org_auditor.check_items(args["--save_report"])
             else:
@@ -88,8 +105,9 @@ def cli():
                 SendGridHandler(credentials.SENDGRID_SETTINGS, "auditor", pkg_resources.require("auditor")[0].version)
             )
 
-            #: Set up org, check & fix items
-            org_auditor = Auditor(summary_logger)
+            #: Set up org, check & fix items. Scheduled runs work on one item at a time unless the credentials file
+            #: sets SCHEDULED_MAX_WORKERS (older credentials files won't have it).
+            org_auditor = Auditor(summary_logger, max_workers=getattr(credentials, "SCHEDULED_MAX_WORKERS", 1))
             org_auditor.check_organization_wide()
             org_auditor.check_items(report=False)  #: Checks will be reported in fix report
             org_auditor.fix_items(report=True)
@@ -13,6 +13,7 @@ AGOL_TABLE = ''  #: URL for Feature Service REST endpoint for AGOL-hosted metata
 REPORT_BASE_PATH = ''  #: File path for report CSVs of everything that was fixed; rotated on each run
 LOG_ROTATE_COUNT = 90  #: Number of logs to rotate through (the n+1 oldest log will be deleted at rotate)
 CACHE_MAX_AGE = None  #: Number of seconds for the Cache Control/cacheMaxAge property (int)
+SCHEDULED_MAX_WORKERS = 1  #: Number of items a scheduled run checks or fixes at the same time (1 = one at a time)
 EMAIL_SETTINGS = {  #: Settings for EmailHandler
     'smtpServer': '',
     'smtpPort': 25,
@@ -2,12 +2,44 @@
 fixes.py: Contains ItemFixer class for fixing problems identified in an AGOL item by an ItemChecker
 """
 
-import json
+import functools
+import tempfile
 from pathlib import Path
 
 import arcgis
 import arcpy
 
+from auditor.checks import ARCPY_LOCK, get_fc_metadata
+
+#: AGOL rejects item metadata longer than this many characters
+MAX_METADATA_LENGTH = 32767
+
+
+@functools.lru_cache(maxsize=256)
+def export_fc_metadata(fc_path, xml_template):
+    """
+    Return the metadata of the feature class at fc_path exported through the
+    xml_template XSLT, as text. Memoized by (fc_path, xml_template) so items
+    sharing a feature class only export it once. Only the text is cached; the
+    arcpy Metadata object is created and discarded here so worker threads never
+    share one. Callers must hold ARCPY_LOCK.
+    """
+
+    with tempfile.TemporaryDirectory(dir=arcpy.env.scratchFolder) as temp_dir:
+        export_path = Path(temp_dir, "metadata.xml")
+        arcpy.metadata.Metadata(fc_path).saveAsUsingCustomXSLT(str(export_path), str(xml_template))
+        return export_path.read_text(encoding="utf-8")
+
+
+def _needs_fix(item_report, fix_key):
+    """
+    Return True if the item's check set its fix_key ('<topic>_fix') flag to
+    'Y' (in either case). A missing flag means the check wasn't run, so there's
+    nothing to fix.
+    """
+
+    return item_report.get(fix_key) in ("Y", "y")
+
 
 class ItemFixer:
     """
@@ -22,6 +54,11 @@ class ItemFixer:
     The results of each fix, or a note that a fix was not needed, are added to
     the item_report dictionary passed to the ItemFixer like thus:
     {<topic>_result: result}
+
+    Fixes that change the item's properties via item.update() don't call it
+    themselves; they stage their changes so they can all be sent in a single
+    call by update_item_properties(), which must be called after them to write
+    their results.
     """
 
     def __init__(self, item, item_report):
@@ -29,86 +66,128 @@ class ItemFixer:
         self.item = item
         self.item_report = item_report
 
-    def tags_fix(self):
+        #: item.update() properties and thumbnail staged by the fixes, and the {<topic>_result: (success, failure)}
+        #: messages to report depending on the outcome of the update
+        self.pending_properties = {}
+        self.pending_thumbnail = None
+        self.pending_results = {}
+
+    def _stage_update(self, result_key, success, failure, item_properties=None, thumbnail=None):
+        """
+        Stage item_properties and/or thumbnail for the next
+        update_item_properties() call, which will set item_report[result_key] to
+        success or failure.
         """
-        Use item.update() to update tags.
 
-        Updates item_report with results for this fix:
-        {tags_result: result}
+        if item_properties:
+            self.pending_properties.update(item_properties)
+        if thumbnail:
+            self.pending_thumbnail = thumbnail
+        self.pending_results[result_key] = (success, failure)
+
+    def update_item_properties(self):
         """
+        Send all the staged property and thumbnail changes to AGOL in one
+        item.update() call and record each staged fix's result.
 
-        tags = self.item_report["tags_new"]
+        Updates item_report with results for each staged fix:
+        {<topic>_result: result}
+        """
 
-        #: Was no update needed?
-        if not tags:
-            self.item_report["tags_result"] = "No update needed for tags"
+        if not self.pending_results:
             return
 
-        update_result = self.item.update({"tags": tags})
+        update_kwargs = {}
+        if self.pending_properties:
+            update_kwargs["item_properties"] = self.pending_properties
+        if self.pending_thumbnail:
+            update_kwargs["thumbnail"] = self.pending_thumbnail
+
+        update_result = self.item.update(**update_kwargs)
 
         #:item.update() returns False if it fails
-        if not update_result:
-            self.item_report["tags_result"] = f"Failed to update tags to {tags}"
+        for result_key, (success, failure) in self.pending_results.items():
+            self.item_report[result_key] = success if update_result else failure
+
+        self.pending_properties = {}
+        self.pending_thumbnail = None
+        self.pending_results = {}
+
+    def tags_fix(self):
+        """
+        Stage new tags for update_item_properties().
+
+        Updates item_report with results for this fix (once the update is sent):
+        {tags_result: result}
+        """
+
+        tags = self.item_report["tags_new"]
+
+        #: Was no update needed? Also skip the update if the item already has these tags (ie, on a re-run).
+        if not tags or list(tags) == list(self.item.tags):
+            self.item_report["tags_result"] = "No update needed for tags"
             return
 
-        self.item_report["tags_result"] = f"Updated tags to {tags}"
+        self._stage_update(
+            "tags_result", f"Updated tags to {tags}", f"Failed to update tags to {tags}", item_properties={"tags": tags}
+        )
 
     def title_fix(self):
         """
-        Use item.update() to update title.
+        Stage new title for update_item_properties().
 
-        Updates item_report with results for this fix:
+        Updates item_report with results for this fix (once the update is sent):
         {title_result: result}
         """
 
         title = self.item_report["title_new"]
 
-        #: Was no update needed?
-        if not title:
+        #: Was no update needed? Also skip the update if the item already has this title (ie, on a re-run).
+        if not title or title == self.item.title:
             self.item_report["title_result"] = "No update needed for title"
             return
 
-        update_result = self.item.update({"title": title})
-
-        #:item.update() returns False if it fails
-        if not update_result:
-            self.item_report["title_result"] = f"Failed to update title to '{title}'"
-            return
-
-        self.item_report["title_result"] = f"Updated title to '{title}'"
+        self._stage_update(
+            "title_result",
+            f"Updated title to '{title}'",
+            f"Failed to update title to '{title}'",
+            item_properties={"title": title},
+        )
 
     def group_fix(self, groups_dict):
         """
         Use item.share() to share to group
-        groups_dict:    A dictionary of all the org's groups and their
-                        corresponding ids.
+        groups_dict:    A mapping of all the org's casefolded group titles to
+                        their Group objects.
 
         Updates item_report with results for this fix:
         {groups_result: result}
         """
 
         #: Was no update needed?
-        if self.item_report["groups_fix"].casefold() != "y":
+        if not _needs_fix(self.item_report, "groups_fix"):
             self.item_report["groups_result"] = "No update needed for groups"
             return
 
         #: Share to everyone and groups
         group_name = self.item_report["group_new"]
 
-        #: Groups should always be found, but in case they're not, report
-        try:
-            gid = groups_dict[group_name]
-            group_object = self.item._gis.groups.search(gid)[0]
-        except (KeyError, IndexError):
+        #: Groups should always be found, but in case they're not, report. The Group objects were all fetched up front,
+        #: so this doesn't need to search the org for each item. Looked up by casefolded title, the same as in
+        #: groups_check(), so the metatable's casing doesn't have to match the group's title.
+        group_object = groups_dict.get(group_name.casefold())
+        if group_object is None:
             self.item_report["groups_result"] = f"Cannot find group '{group_name}' in organization"
             return
+        group_name = group_object.title
 
-        everyone_result = False
-        self.item.sharing.sharing_level = self.item.sharing.sharing_level.EVERYONE
-        if self.item.sharing.sharing_level == self.item.sharing.sharing_level.EVERYONE:
-            everyone_result = True
+        #: Each read of sharing_level is a request; get the EVERYONE level once and reuse it for the check
+        sharing = self.item.sharing
+        everyone_level = sharing.sharing_level.EVERYONE
+        sharing.sharing_level = everyone_level
+        everyone_result = sharing.sharing_level == everyone_level
 
-        group_result = self.item.sharing.groups.add(group_object)
+        group_result = sharing.groups.add(group_object)
 
         results = {"everyone": "Shared with everyone", "group": f"Shared with group '{group_name}'"}
         if not everyone_result:
@@ -118,22 +197,30 @@ class ItemFixer:
 
         self.item_report["groups_result"] = f"{results['everyone']}, {results['group']}"
 
-    def folder_fix(self):
+    def folder_fix(self, folders_dict=None):
         """
         Use item.move() to move item to folder.
+        folders_dict:   Optional; a mapping of the user's folder titles to
+                        their folder dicts (as returned by User.folders). If
+                        provided, the item is moved using the folder's id
+                        rather than having arcgis look the folder up by name.
 
         Updates item_report with results for this fix:
         {folder_result: result}
         """
 
         #: Was no update needed?
-        if self.item_report["folder_fix"].casefold() != "y":
+        if not _needs_fix(self.item_report, "folder_fix"):
             self.item_report["folder_result"] = "No update needed for folder"
             return
 
-        #: Try the move
         folder = self.item_report["folder_new"]
-        move_result = self.item.move(folder)
+        if folders_dict is not None and folder not in folders_dict:
+            self.item_report["folder_result"] = f"'{folder}' folder not found"
+            return
+
+        #: Try the move
+        move_result = self.item.move(folders_dict[folder] if folders_dict is not None else folder)
 
         #: .move(folder) returns None if folder not found
         if not move_result:
@@ -156,7 +243,7 @@ class ItemFixer:
         {tags_title_result: result}
         """
 
-        if self.item_report["delete_protection_fix"].casefold() != "y":
+        if not _needs_fix(self.item_report, "delete_protection_fix"):
             self.item_report["delete_protection_result"] = "No update needed for delete protection"
             return
 
@@ -171,21 +258,32 @@ class ItemFixer:
     def downloads_fix(self):
         """
         Create a FeatureLayerCollection from item and use it's manager object to
-        allow downloads by adding 'Extract' to it's capabilities.
+        allow downloads by adding 'Extract' to it's capabilities. Uses the new
+        capabilities from the check if they're in item_report; otherwise they
+        are built from the service's current properties.
 
         Updates item_report with results for this fix:
         {downloads_result: result}
         """
 
-        if self.item_report["downloads_fix"].casefold() != "y":
+        if not _needs_fix(self.item_report, "downloads_fix"):
             self.item_report["downloads_result"] = "No update needed for downloads"
             return
 
         manager = arcgis.features.FeatureLayerCollection.fromitem(self.item).manager
-        properties = json.loads(str(manager.properties))
 
-        current_capabilities = properties["capabilities"]
-        new_capabilities = current_capabilities + ",Extract"
+        new_capabilities = self.item_report.get("downloads_new")
+        if not new_capabilities:
+            #: manager.properties is a PropertyMap (a dict subclass); no need to round-trip it through json
+            current_capabilities = manager.properties["capabilities"]
+
+            #: Don't post an update if downloads were enabled since the check
+            if "Extract" in {capability.strip() for capability in current_capabilities.split(",")}:
+                self.item_report["downloads_result"] = "No update needed for downloads"
+                return
+
+            new_capabilities = current_capabilities + ",Extract"
+
         download_result = manager.update_definition({"capabilities": new_capabilities})
 
         if not download_result["success"]:
@@ -194,18 +292,20 @@ class ItemFixer:
 
         self.item_report["downloads_result"] = "Downloads enabled"
 
-    def metadata_fix(self, xml_template):
+    def metadata_fix(self, xml_template, verify=False):
         """
         Overwrite the existing AGOL metadata with the metadata from a source
-        feature class using agol_item.metadata = fc_metadata.xml where
-        fc_metadata is an arcpy.metadata.Metadata() object created via the
-        arcpy.metadata library.
+        feature class, exported through xml_template by export_fc_metadata().
+
+        verify:     If True, read the item's metadata back from AGOL and compare
+                    it to the feature class's metadata. Otherwise, trust the
+                    result of the upload (saves a round trip per item).
 
         Updates item_report with results for this fix:
         {metdata_result: result}
         """
 
-        if self.item_report["metadata_fix"].casefold() != "y":
+        if not _needs_fix(self.item_report, "metadata_fix"):
             self.item_report["metadata_result"] = "No update needed for metadata"
             return
 
@@ -216,11 +316,23 @@ class ItemFixer:
 
         fc_path = self.item_report["metadata_new"]
 
-        arcpy_metadata = arcpy.metadata.Metadata(fc_path)
+        #: Items are fixed in worker threads and arcpy isn't thread-safe
+        with ARCPY_LOCK:
+            metadata_xml = export_fc_metadata(str(fc_path), str(xml_template))
+            fc_metadata_xml = get_fc_metadata(str(fc_path)).xml if verify else None
+            scratch_folder = arcpy.env.scratchFolder
+
+        #: Check the length locally rather than sending metadata that AGOL will reject
+        if len(metadata_xml) > MAX_METADATA_LENGTH:
+            self.item_report["metadata_result"] = (
+                f"Metadata too long to upload from '{fc_path}' "
+                f"({len(metadata_xml):,} > {MAX_METADATA_LENGTH:,} characters)"
+            )
+            return
 
         item_id = self.item.itemid
         i = 0
-        metadata_xml_path = Path(arcpy.env.scratchFolder, "auditor", f"{item_id}_{i}.xml")
+        metadata_xml_path = Path(scratch_folder, "auditor", f"{item_id}_{i}.xml")
         #: Sometimes a network error leaves a phantom lock on the metadata xml file when retrying. If we can't unlink()
         #: the file, increment its counter and check if it exists again.
         while metadata_xml_path.exists():
@@ -228,12 +340,13 @@ class ItemFixer:
                 metadata_xml_path.unlink()
             except PermissionError:
                 i += 1
-                metadata_xml_path = Path(arcpy.env.scratchFolder, "auditor", f"{item_id}_{i}.xml")
+                metadata_xml_path = Path(scratch_folder, "auditor", f"{item_id}_{i}.xml")
 
-        arcpy_metadata.saveAsUsingCustomXSLT(str(metadata_xml_path), xml_template)
+        #: item.update() uploads the metadata from a file
+        metadata_xml_path.write_text(metadata_xml, encoding="utf-8")
 
         try:
-            self.item.update(metadata=str(metadata_xml_path))
+            metadata_update_result = self.item.update(metadata=str(metadata_xml_path))
 
             #: Re-upload tags
             tag_update_result = self.item.update({"tags": good_tags})
@@ -241,7 +354,9 @@ class ItemFixer:
             if not tag_update_result:
                 tag_result = "unable to reapply tags"
 
-            if self.item.metadata != arcpy_metadata.xml:
+            #: Only re-download the item's metadata if asked to; otherwise, item.update() returning False is our
+            #: failure signal
+            if not metadata_update_result or (verify and self.item.metadata != fc_metadata_xml):
                 self.item_report["metadata_result"] = (
                     f"Tried to update metadata from '{fc_path}'; verify manually; {tag_result}"
                 )
@@ -255,54 +370,58 @@ class ItemFixer:
 
     def description_note_fix(self, static_note, shelved_note):
         """
-        Add static_note or shelved_note to beginning of the description field
-        with a blank space before the rest of the description. static_note and
-        shelved_note should be strings of properly-formatted HTML.
+        Stage static_note or shelved_note to be added to beginning of the
+        description field with a blank space before the rest of the
+        description. static_note and shelved_note should be strings of
+        properly-formatted HTML.
 
-        Updates item_report with results for this fix:
+        Updates item_report with results for this fix (once the update is sent
+        by update_item_properties()):
         {description_note_result: result}
         """
 
-        if self.item_report["description_note_fix"].casefold() != "y":
+        if not _needs_fix(self.item_report, "description_note_fix"):
             self.item_report["description_note_result"] = "No update needed for description"
             return
 
         source = self.item_report["description_note_source"]
-        new_description = self.item.description
+        #: Read the item's description once
+        current_description = self.item.description
+        new_description = current_description
         if source == "shelved":
-            new_description = f"{shelved_note}<div><br />{self.item.description}"
+            new_description = f"{shelved_note}<div><br />{current_description}"
         elif source == "static":
-            new_description = f"{static_note}<div><br />{self.item.description}"
-
-        update_result = self.item.update(item_properties={"description": new_description})
+            new_description = f"{static_note}<div><br />{current_description}"
 
-        if not update_result:
-            self.item_report["description_note_result"] = f"Failed to add {source} note to description"
-            return
-
-        self.item_report["description_note_result"] = f"{source} note added to description"
+        self._stage_update(
+            "description_note_result",
+            f"{source} note added to description",
+            f"Failed to add {source} note to description",
+            item_properties={"description": new_description},
+        )
 
     def thumbnail_fix(self):
         """
-        Overwrite the thumbnail if the item is in one of the icon groups. The
-        item_report dictionary should have the path to the new thumbnail.
+        Stage the thumbnail to be overwritten if the item is in one of the icon
+        groups. The item_report dictionary should have the path to the new
+        thumbnail.
 
-        Updates item_report with results for this fix:
+        Updates item_report with results for this fix (once the update is sent
+        by update_item_properties()):
         {thumbnail_result: result}
         """
 
-        if self.item_report["thumbnail_fix"].casefold() != "y":
+        if not _needs_fix(self.item_report, "thumbnail_fix"):
             self.item_report["thumbnail_result"] = "No update needed for thumbnail"
             return
 
         thumbnail_path = self.item_report["thumbnail_path"]
-        update_result = self.item.update(thumbnail=thumbnail_path)
-
-        if not update_result:
-            self.item_report["thumbnail_result"] = f"Failed to update thumbnail from {thumbnail_path}"
-            return
-
-        self.item_report["thumbnail_result"] = f"Thumbnail updated from {thumbnail_path}"
+        self._stage_update(
+            "thumbnail_result",
+            f"Thumbnail updated from {thumbnail_path}",
+            f"Failed to update thumbnail from {thumbnail_path}",
+            thumbnail=thumbnail_path,
+        )
 
     def authoritative_fix(self):
         """
@@ -313,14 +432,13 @@ class ItemFixer:
         {authoritative_result: result}
         """
 
-        new_authoritative = self.item_report["authoritative_new"]
-        if not self.item_report["authoritative_new"]:
-            new_authoritative = None  #: translate '' to None for arcgis api
-
-        if self.item_report["authoritative_fix"].casefold() != "y":
+        if not _needs_fix(self.item_report, "authoritative_fix"):
             self.item_report["authoritative_result"] = "No update needed for content status"
             return
 
+        #: translate '' to None for arcgis api
+        new_authoritative = self.item_report["authoritative_new"] or None
+
         try:
             self.item.content_status = new_authoritative
             self.item_report["authoritative_result"] = f"Content status updated to '{new_authoritative}'"
@@ -346,7 +464,7 @@ class ItemFixer:
         {visibility_result: result}
         """
 
-        if self.item_report["visibility_fix"].casefold() != "y":
+        if not _needs_fix(self.item_report, "visibility_fix"):
             self.item_report["visibility_result"] = "No update needed for visibility"
             return
 
@@ -372,7 +490,7 @@ class ItemFixer:
         {cache_age_result: result}
         """
 
-        if self.item_report["cache_age_fix"].casefold() != "y":
+        if not _needs_fix(self.item_report, "cache_age_fix"):
             self.item_report["cache_age_result"] = "No update needed for cacheMaxAge"
             return
 
@@ -6,37 +6,94 @@ See cli.py for usage
 
 import datetime
 import logging
-import uuid
+import logging.handlers
+import random
+import re
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from time import sleep
+from types import MappingProxyType
 
 import arcgis
 import arcpy
+from requests.adapters import HTTPAdapter
+from requests.exceptions import InvalidSchema
 
 from auditor import checks, credentials, fixes, org_checker
 
+#: Minimum number of pooled keep-alive connections to the org. Auditor.setup() raises this to its worker count if
+#: needed so threads don't open and discard connections when the pool is full.
+HTTP_POOL_SIZE = 32
 
-def retry(worker, verbose=True, tries=1):
+#: AGOL item ids are UUIDs written as 32 hex digits; also accept the hyphenated 8-4-4-4-12 form that uuid.UUID() did
+ITEMID_PATTERN = re.compile(r"[0-9a-f]{32}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE)
+
+#: A metatable row for one item id. Named fields instead of list positions, and a smaller per-row footprint.
+MetaRow = namedtuple("MetaRow", ["sgid_name", "agol_name", "category", "authoritative"])
+
+
+def pool_connections(gis, pool_size=HTTP_POOL_SIZE):
+    """
+    Enlarge the connection pool of the requests session the GIS uses for all of its REST calls, so that every check and
+    fix reuses open TCP/TLS connections instead of handshaking for each call.
+
+    arcgis may have mounted its own https adapter on the session (for truststore, PKI, or auth), so that adapter is
+    kept and only its pool is rebuilt. A plain HTTPAdapter is only mounted if the session doesn't have one for https.
+    Retries are left to retry() so a failed request isn't retried at both levels.
+
+    The session is a private attribute of the arcgis connection; if it isn't there (or isn't a requests session), the
+    GIS is left as-is.
+    """
+
+    session = getattr(getattr(gis, "_con", None), "_session", None)
+    if not hasattr(session, "get_adapter"):
+        logging.getLogger(__name__).debug(
+            f"GIS connection has no requests session ({type(session).__name__}); connection pool left as-is"
+        )
+        return
+
+    try:
+        adapter = session.get_adapter("https://")
+    except InvalidSchema:
+        session.mount("https://", HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+        return
+
+    #: Close the old pool's connections so a retried setup() doesn't leave one behind each time. Goes through any
+    #: subclass's init_poolmanager() override, so its TLS/auth settings are applied to the new pool.
+    if isinstance(adapter, HTTPAdapter):
+        adapter.poolmanager.clear()
+        adapter.init_poolmanager(pool_size, pool_size, block=False)
+
+
+def retry(worker, verbose=True, tries=1, max_tries=3, max_delay=30):
     """
     Helper function to retry a function or method with an incremental wait time.
     Useful for methods reliant on unreliable network connections.
+
+    Returns whatever worker() returns once it succeeds; re-raises the last
+    error if it still fails after max_tries retries. The exponential wait is
+    capped at max_delay seconds, and a little random jitter is added to each
+    wait so items being retried in parallel threads don't all hit AGOL again at
+    the same moment.
     """
-    max_tries = 3
     delay = 2  #: in seconds
 
-    try:
-        return worker()
-
-    #: Retry on HTTPErrors (ie, bad connections to AGOL)
-    except Exception as error:
-        if tries <= max_tries:
-            wait_time = delay**tries
+    while True:
+        try:
+            return worker()
+
+        #: Retry on HTTPErrors (ie, bad connections to AGOL). arcgis raises bare Exceptions for REST errors, so this
+        #: can't be narrowed further.
+        except Exception as error:
+            if tries > max_tries:
+                raise
+            wait_time = min(delay**tries, max_delay) + random.uniform(0, tries / 2)
             if verbose:
-                print(f'Exception "{error}" thrown on "{worker}". Retrying after {wait_time} seconds...')
+                print(f'Exception "{error}" thrown on "{worker}". Retrying after {wait_time:.1f} seconds...')
             sleep(wait_time)
-            retry(worker, verbose, tries + 1)
-        else:
-            raise error
+            tries += 1
 
 
 #: TODO: Modify structure so each check/fix method returns its values directly rather than putting them inside
@@ -53,9 +110,15 @@ def log_report(report_dict, report_file, separator="|", rotate_count=18):
     rotate_count:   The number of files to save before RotatingFileHandler deletes old reports. Defaults to 2.5 weeks.
 
     """
-    #: Set up a rotating file handler for the report log
+    #: Set up a rotating file handler for the report log. getLogger() always returns the same logger, so close and
+    #: remove the handlers from any previous report (ie, check_items() then fix_items()) so rows aren't written to
+    #: every report file opened so far. Don't propagate to the root logger so the report isn't written to the main log.
     report_path = Path(report_file)
     report_logger = logging.getLogger("audit_report")
+    for old_handler in list(report_logger.handlers):
+        report_logger.removeHandler(old_handler)
+        old_handler.close()
+    report_logger.propagate = False
     report_handler = logging.handlers.RotatingFileHandler(report_path, backupCount=rotate_count)
     report_handler.doRollover()  #: Rotate the log on each run
     report_handler.setLevel(logging.DEBUG)
@@ -66,17 +129,20 @@ def log_report(report_dict, report_file, separator="|", rotate_count=18):
     timestamp = datetime.datetime.now()
     report_logger.info(timestamp)
 
-    #: Get the column values from the keys of nested dict of the first item and log as csv header
+    #: Get the column values from the keys of nested dict of the first item and use as csv header
     columns = list(next(iter(report_dict.items()))[1].keys())
-    header = f"agol_id{separator}{separator.join(columns)}"
-    report_logger.info(header)
+    rows = [f"agol_id{separator}{separator.join(columns)}"]
 
     #: iterate through report_dict, using the columns generated above as keys of each nested dict to
     #: ensure the order stays the same for each row.
     for agol_id, item_report_dict in report_dict.items():
         item_list = [agol_id]
         item_list.extend([str(item_report_dict[col]) for col in columns])
-        report_logger.info(separator.join(item_list))
+        rows.append(separator.join(item_list))
+
+    #: Log the header and all the rows as one record so the handler does a single write and flush instead of one per
+    #: row. The handler's newline terminator ends the last row, so the file contents are the same.
+    report_logger.info("\n".join(rows))
 
 
 class Metatable:
@@ -84,27 +150,32 @@ class Metatable:
     Represents the metatable containing information about SGID items uploaded to AGOL.
     read_metatable() can be called on both the SGID AGOLItems table or the AGOL-hosted AGOLItems_Shelved table.
     Table stored as self.metatable_dict in the following format:
-        {item_id: [table_sgid_name, table_agol_name, table_category, table_authoritative]}
+        {item_id: MetaRow(sgid_name, agol_name, category, authoritative)}
     Any duplicate item ids (either a table has the same AGOL item in more than one row, or the item id exists in
-    multiple tables) are added to the self.duplicate_keys list.
+    multiple tables) are added to the self.duplicate_keys set.
     """
 
     def __init__(self):
         #: A dictionary of the metatable records, indexed by the metatable's itemid
-        #: values: {item_id: [table_sgid_name, table_agol_name, table_category, table_authoritative]}
+        #: values: {item_id: MetaRow(sgid_name, agol_name, category, authoritative)}
         self.metatable_dict = {}
-        self.duplicate_keys = []
+        #: Each duplicated item id is only listed once, no matter how many times it's repeated
+        self.duplicate_keys = set()
 
     def read_metatable(self, table, fields):
         """
         Read metatable 'table' into self.metatable_dict. Any duplicate Item IDs are added to self.duplicate_keys.
-        Any rows with an Item ID that can't be parsed as a UUID is not added to self.metatable_dict.
+        Any rows with an Item ID that doesn't match ITEMID_PATTERN are not added to self.metatable_dict.
 
         table:      Path to a table readable by arcpy.da.SearchCursor
-        fields:     List of fields names to access in the table.
+        fields:     List of fields names to access in the table. The second field must be the AGOL item id.
         """
 
-        for row in self._cursor_wrapper(table, fields):
+        #: Let the database drop rows without an item id instead of sending them to Python just to be skipped. The
+        #: rest of the validation stays below because string functions like LEN() differ between workspace types.
+        where_clause = f"{arcpy.AddFieldDelimiters(table, fields[1])} IS NOT NULL"
+
+        for row in self._cursor_wrapper(table, fields, where_clause):
 
             #: If table is from SGID, get "authoritative" from table and set "category" to SGID. Otherwise,
             #: get "category" from table and set "authoritative" to 'n'.
@@ -116,32 +187,27 @@ class Metatable:
                 table_sgid_name, table_agol_itemid, table_agol_name, table_category = row
                 table_authoritative = "n"
 
-            #: Item IDs are UUIDs. If we can't parse the item id listed in the table, it means the layer is not
-            #: in AGOL and this row should be skipped (catches both magic words and empty entries)
-            try:
-                uuid.UUID(table_agol_itemid)
-            except (AttributeError, ValueError, TypeError):
+            #: Item IDs are UUIDs. If the item id listed in the table doesn't look like one, it means the layer is not
+            #: in AGOL and this row should be skipped (catches magic words, empty entries, and nulls)
+            if not isinstance(table_agol_itemid, str) or not ITEMID_PATTERN.fullmatch(table_agol_itemid):
                 continue
 
-            if table_agol_itemid not in self.metatable_dict:
-                self.metatable_dict[table_agol_itemid] = [
-                    table_sgid_name,
-                    table_agol_name,
-                    table_category,
-                    table_authoritative,
-                ]
-            else:
-                self.duplicate_keys.append(table_agol_itemid)
+            #: setdefault() only adds the first row for an id; a later row with the same id (from this table or one
+            #: read earlier) gets the first row back instead of its own, so it's a duplicate.
+            record = MetaRow(table_sgid_name, table_agol_name, table_category, table_authoritative)
+            if self.metatable_dict.setdefault(table_agol_itemid, record) is not record:
+                self.duplicate_keys.add(table_agol_itemid)
 
-    def _cursor_wrapper(self, table, fields):
+    def _cursor_wrapper(self, table, fields, where_clause=None):
         """
         Wrapper for arcpy.da.SearchCursor so that it can be Mocked out in testing.
 
-        table:      Path to a table readable by arcpy.da.SearchCursor
-        fields:     List of fields names to access in the table.
+        table:          Path to a table readable by arcpy.da.SearchCursor
+        fields:         List of fields names to access in the table.
+        where_clause:   Optional SQL expression to limit the rows returned.
         """
 
-        with arcpy.da.SearchCursor(table, fields) as search_cursor:
+        with arcpy.da.SearchCursor(table, fields, where_clause=where_clause) as search_cursor:
             for row in search_cursor:
                 yield row
 
@@ -159,8 +225,9 @@ class Auditor:
         self.report_dict: Nested dictionary holding the results of checks and fixes
         self.items_to_check: List of ArcGIS API for Python Item objects to audit
         self.itemid_and_folder: Dict of item ids and their folders
-        self.groups_dict: Dict of group names and ids
-        self.fix_counts: Dict of number of fixes performed for each fix type
+        self.groups_dict: Read-only mapping of casefolded group titles to Group objects
+        self.folders_dict: Read-only mapping of the user's folder names to their folder dicts
+        self.fix_counts: Counter of number of fixes performed for each fix type
         self.gis: The organization's ArcGIS API for Python gis object
         self.metatable: auditor.Metatable object holding info from both metatables
         self.verbose: Print status messages
@@ -169,32 +236,36 @@ class Auditor:
         self.thumbnail_dir: Path holding item thumbnail .pngs
         self.log: logging object
         self.item_ids: Optional; if provided, only check these ids. Otherwise, check all HFS in org.
+        self.max_workers: Number of items to check or fix at the same time
     """
 
-    #: Tags or words that should be uppercased, saved as lower to check against
+    #: Tags or words that should be uppercased, saved as lower to check against. Stored as frozensets so the per-tag
+    #: membership tests in checks.tag_case() and ItemChecker.tags_check() are hash lookups.
     # fmt: off
-    uppercased_tags = [
+    uppercased_tags = frozenset([
         '2g', '3g', '4g', 'agol', 'aog', 'at&t', 'atv', 'blm', 'brat', 'caf', 'cdl', 'dabc', 'dabs', 'daq', 'dem',
         'dfcm', 'dfirm', 'dnr', 'dogm', 'dot', 'dsl', 'dsm', 'dtm', 'dup', 'dwq', 'e911', 'ems', 'epa', 'fae', 'fcc',
         'fema', 'gcdb', 'gis', 'gnis', 'hava', 'huc', 'lir', 'lrs', 'lte', 'luca', 'mrrc', 'nca', 'ng911', 'ngda',
         'nox', 'npsbn', 'ntia', 'nwi', 'osa', 'pli', 'plss', 'pm10', 'ppm', 'psap', 'sao', 'sbdc', 'sbi', 'sgid',
         'shpo', 'sitla', 'sligp', 'trax', 'uca', 'udot', 'ugrc', 'ugs', 'uhp', 'uic', 'uipa', 'us', 'usao', 'usdw',
         'usfs', 'usfws', 'usps', 'ustc', 'ut', 'uta', 'utsc', 'vcp', 'vista', 'voc', 'wbd', 'wre'
-    ]
+    ])
     # fmt: on
 
     #: Articles that should be left lowercase.
-    articles = ["a", "an", "the", "of", "is", "in"]
+    articles = frozenset(["a", "an", "the", "of", "is", "in"])
 
     #: Tags that should be deleted, saved as lower to check against
-    tags_to_delete = [
-        ".sd",
-        "service definition",
-        "required: common-use word or phrase used to describe the subject of the data set",
-        "002",
-        "required: common-use word or phrase used to describe the subject of the data set.",
-        "agrc",
-    ]
+    tags_to_delete = frozenset(
+        [
+            ".sd",
+            "service definition",
+            "required: common-use word or phrase used to describe the subject of the data set",
+            "002",
+            "required: common-use word or phrase used to describe the subject of the data set.",
+            "agrc",
+        ]
+    )
 
     #: Notes for static and shelved descriptions
     static_note = (
@@ -208,7 +279,7 @@ class Auditor:
         "Online. There may (or may not) be a newer vintage of this dataset in the SGID.</i>"
     )
 
-    def __init__(self, log, verbose=False, item_ids=None):
+    def __init__(self, log, verbose=False, item_ids=None, max_workers=8):
         """
         Create an arcgis.gis.GIS object using the user, portal, and password set in credentials.py. Automatically
         create a list of all the Feature Service objects in the user's folders and a dictionary of each item's folder
@@ -232,11 +303,18 @@ class Auditor:
         #: A dictionary of items and their folder
         self.itemid_and_folder = {}
 
-        #: A dictionary of groups and their ID:
+        #: A dictionary of the org's casefolded group titles and their Group objects
         self.groups_dict = {}
 
+        #: A dictionary of the user's folder titles and their folder info dicts (including their ids)
+        self.folders_dict = {}
+
         #: Simplified count of fixes for logging:
-        self.fix_counts = {}
+        self.fix_counts = Counter()
+
+        #: Folder listings fetched during setup(), kept until setup() succeeds so a retry only lists the folders that
+        #: hadn't been fetched yet: {folder title (None for root): [Item, ...]}
+        self._folder_items = {}
 
         #: GIS object
         self.gis = None
@@ -256,14 +334,20 @@ class Auditor:
 
         self.item_ids = item_ids
 
-        #: Wrapped in retry() to catch any connection problems.
+        #: The checks are dominated by AGOL REST round-trips, so several items are checked at once in worker threads
+        self.max_workers = max_workers
+
+        #: Wrapped in retry() to catch any connection problems. The metatables are read separately so that retrying a
+        #: failed login or item listing doesn't re-read them.
         retry(self.setup)
+        retry(self._read_metatables)
 
     def setup(self):
         """
-        Sets up the Auditor by logging into the ArcGIS org, getting all the items and folders, and reading in the
-        metatable(s). To be called in __init__().
-        In case of multiple calls (ie, for retry()), all data are re-instantiated/initialized.
+        Sets up the Auditor by logging into the ArcGIS org and getting all the items, folders, and groups. To be called
+        in __init__().
+        In case of multiple calls (ie, for retry()), all data are re-instantiated/initialized, except that folders
+        already listed by a failed call aren't listed again.
         """
 
         #: temp_dir used by fixes.metadata_fix() to hold xml of sde metadata
@@ -276,6 +360,8 @@ class Auditor:
         self.log.info(f"Logging into {credentials.ORG} as {credentials.USERNAME}")
 
         self.gis = arcgis.gis.GIS(credentials.ORG, credentials.USERNAME, credentials.PASSWORD)
+        #: Keep at least one pooled connection per worker thread so the workers never wait on the pool
+        pool_connections(self.gis, max(HTTP_POOL_SIZE, self.max_workers))
 
         #: Make sure ArcGIS Pro is properly logged in
         arcpy.SignInToPortal(arcpy.GetActivePortalURL(), credentials.USERNAME, credentials.PASSWORD)
@@ -286,9 +372,13 @@ class Auditor:
         if self.verbose:
             print(f"Getting {self.username}'s folders...")
         folders = {None: None}
-        for folder in user_item.folders:
+        user_folders = user_item.folders
+        for folder in user_folders:
             folders[folder["id"]] = folder["title"]
 
+        #: Keep the folder info so folder_fix() can move items by id instead of having arcgis look up each folder name
+        self.folders_dict = MappingProxyType({folder["title"]: folder for folder in user_folders})
+
         self.items_to_check = []  #: Clear this out again in case retry calls setup() multiple times.
 
         #: Get item object and it's correspond folder for each relevant item
@@ -307,16 +397,38 @@ class Auditor:
                 except KeyError:
                     raise ValueError(f"Folder id {item.ownerFolder} not found (wrong user?)")
 
-        #: No user-provided item ids, get all hosted feature services in every folder
+        #: No user-provided item ids, get all hosted feature services in every folder. Each folder's listing is a
+        #: separate request, so list them concurrently.
         else:
-            for _, name in folders.items():
-                for item in user_item.items(name, 1000):
-                    if item.type == "Feature Service":
-                        self.items_to_check.append(item)
-                        self.itemid_and_folder[item.itemid] = name
-
-        #: Read the metatable into memory as a dictionary based on itemid.
-        #: Getting this once so we don't have to re-read every iteration
+            folder_names = list(folders.values())
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(folder_names))) as executor:
+                folder_items = executor.map(partial(self._list_folder_items, user_item), folder_names)
+                for name, items in zip(folder_names, folder_items):
+                    for item in items:
+                        if item.type == "Feature Service":
+                            self.items_to_check.append(item)
+                            self.itemid_and_folder[item.itemid] = name
+
+        #: Get the groups once for all the items' group fixes, keeping the Group objects so group_fix() doesn't have to
+        #: search for them again. search() defaults to returning 1,000 groups, so raise the limit to make sure we get
+        #: them all. Keyed by casefolded title so groups_check() and group_fix() both match a metatable category to its
+        #: group regardless of case. Read-only because it's shared by the checker and fixer threads.
+        if self.verbose:
+            print("Getting groups...")
+        groups = self.gis.groups.search("title:*", max_groups=10000)  # pylint: disable=no-member
+        self.groups_dict = MappingProxyType({g.title.casefold(): g for g in groups})
+
+        #: Everything's loaded; don't hold on to the listings (or reuse them if setup() is ever called again)
+        self._folder_items.clear()
+
+    def _read_metatables(self):
+        """
+        Read the SGID and AGOL metatables into memory as a dictionary based on itemid. Getting this once so we don't
+        have to re-read every iteration. To be called in __init__() after setup().
+        In case of multiple calls (ie, for retry()), self.metatable is rebuilt so rows from a failed read aren't
+        counted as duplicates.
+        """
+
         if self.verbose:
             print("Getting metatable info...")
 
@@ -328,17 +440,82 @@ class Auditor:
         self.metatable.read_metatable(self.agol_table, agol_fields)
 
         if self.metatable.duplicate_keys:
-            raise RuntimeError(f"Duplicate AGOL item IDs found in metatables: {self.metatable.duplicate_keys}")
+            raise RuntimeError(f"Duplicate AGOL item IDs found in metatables: {sorted(self.metatable.duplicate_keys)}")
+
+    def _list_folder_items(self, user_item, folder):
+        """
+        Get the items in one of the user's folders, reusing the listing from an earlier setup() attempt that got this
+        folder before failing (rebound to the current self.gis). Called from a worker thread by setup().
+
+        Args
+        ----
+            user_item: The arcgis User whose folder is being listed
+            folder: The folder's title, or None for the root folder
+
+        Returns
+        -------
+            List of the folder's Item objects
+        """
+
+        if folder not in self._folder_items:
+            self._folder_items[folder] = user_item.items(folder, max_items=1000)
+            return self._folder_items[folder]
+
+        #: Listed by an earlier attempt, so the Items are bound to that attempt's (possibly broken) GIS. Rebuild them on
+        #: the current GIS from their cached properties, which doesn't make any requests.
+        return [arcgis.gis.Item(self.gis, item.itemid, dict(item)) for item in self._folder_items[folder]]
+
+    def _check_item(self, item, counter):
+        """Runs the checks on a single item. Called from a worker thread by check_items().
+
+        Args
+        ----
+            item: ArcGIS API for Python Item object to check
+            counter: Item's position in self.items_to_check, for status messages
+
+        Returns
+        -------
+            (itemid, checker.results_dict), or None if the item was skipped
+        """
 
-        #: Get the groups
         if self.verbose:
-            print("Getting groups...")
-        groups = self.gis.groups.search("title:*")  # pylint: disable=no-member
-        self.groups_dict = {g.title: g.id for g in groups}
+            print(f"Checking {item.title} ({counter} of {len(self.items_to_check)})...")
+
+        if not item.url.startswith("https://services"):
+            print(f"Skipping {item.title} because it's not an AGOL feature service (url: {item.url})")
+            return None
+
+        checker = checks.ItemChecker(item, self.metatable.metatable_dict)
+        retry(partial(checker.setup, credentials.DB))
+
+        #: The checks to run on this item, in order, with their arguments bound
+        item_checks = [
+            partial(checker.tags_check, self.tags_to_delete, self.uppercased_tags, self.articles),
+            checker.title_check,
+            partial(checker.folder_check, self.itemid_and_folder),
+            partial(checker.groups_check, self.groups_dict),
+            checker.downloads_check,
+            checker.delete_protection_check,
+            # checker.metadata_check,
+            partial(checker.description_note_check, self.static_note, self.shelved_note),
+            partial(checker.thumbnail_check, self.thumbnail_dir),
+            checker.authoritative_check,
+            checker.visibility_check,
+            partial(checker.cache_age_check, credentials.CACHE_MAX_AGE),
+        ]
+
+        #: Run the checks on this item
+        for item_check in item_checks:
+            retry(item_check)
+
+        return item.itemid, checker.results_dict
 
     def check_items(self, report=False):
         """Runs the checks on all the items and saves results in self.report_dict for use by a fixer
 
+        Items are checked concurrently by self.max_workers threads; results are added to self.report_dict in the
+        same order as self.items_to_check.
+
         Args
         ----
             report: Optional; If True, save self.report_dict to path specified in credentials.py
@@ -346,51 +523,20 @@ class Auditor:
 
         self.log.info(f"Checking {len(self.items_to_check)} items")
 
-        counter = 0
+        counters = range(1, len(self.items_to_check) + 1)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
         try:
-            for item in self.items_to_check:
-
-                counter += 1
-
-                if self.verbose:
-                    print(f"Checking {item.title} ({counter} of {len(self.items_to_check)})...")
-
-                if not item.url.startswith("https://services"):
-                    print(f"Skipping {item.title} because it's not an AGOL feature service (url: {item.url})")
+            for result in executor.map(self._check_item, self.items_to_check, counters):
+                if not result:
                     continue
 
-                itemid = item.itemid
-
-                #: Initialize empty dictionary for this item
-                self.report_dict[itemid] = {}
-
-                checker = checks.ItemChecker(item, self.metatable.metatable_dict)
-                retry(lambda: checker.setup(credentials.DB))  # pylint: disable=cell-var-from-loop
-
-                #: TODO: add each method and it's args to a list, then iterate through the list (DRY)
-
-                #: Run the checks on this item
-                retry(
-                    lambda: checker.tags_check(self.tags_to_delete, self.uppercased_tags, self.articles)
-                )  # pylint: disable=cell-var-from-loop
-                retry(checker.title_check)
-                retry(lambda: checker.folder_check(self.itemid_and_folder))  # pylint: disable=cell-var-from-loop
-                retry(checker.groups_check)
-                retry(checker.downloads_check)
-                retry(checker.delete_protection_check)
-                # retry(checker.metadata_check)
-                retry(
-                    lambda: checker.description_note_check(self.static_note, self.shelved_note)
-                )  # pylint: disable=cell-var-from-loop
-                checker.thumbnail_check(self.thumbnail_dir)
-                retry(checker.authoritative_check)
-                retry(checker.visibility_check)
-                retry(lambda: checker.cache_age_check(credentials.CACHE_MAX_AGE))  # pylint: disable=cell-var-from-loop
-
                 #: Add results to the report
-                self.report_dict[itemid].update(checker.results_dict)
+                itemid, results_dict = result
+                self.report_dict.setdefault(itemid, {}).update(results_dict)
 
         finally:
+            #: Don't start any more items if one of them raised
+            executor.shutdown(cancel_futures=True)
             if report:
                 log_report(self.report_dict, credentials.REPORT_BASE_PATH, rotate_count=credentials.LOG_ROTATE_COUNT)
 
@@ -411,84 +557,112 @@ class Auditor:
             else:
                 self.log.info(f"{check} returned no results")
 
+    def _fix_item(self, itemid, counter):
+        """Runs the fixes on a single item using its entry in self.report_dict, which the fixes update with their
+        results.
+
+        Args
+        ----
+            itemid: AGOL item id of the item to fix
+            counter: Item's position in self.report_dict, for status messages
+
+        Returns
+        -------
+            The item's report dictionary, including the fixes' <topic>_result entries
+        """
+
+        item = retry(partial(self.gis.content.get, itemid))
+        item_report = self.report_dict[itemid]
+
+        if self.verbose:
+            print(f"Evaluating report for fixes on {item.title} ({counter} of {len(self.report_dict)})...")
+
+        fixer = fixes.ItemFixer(item, item_report)
+
+        #: The fixes to run on this item, in order, with their arguments bound
+        item_fixes = [
+            #: Do the metadata fix first so that the tags, title, and
+            #: description fixes later on aren't overwritten by the metadata
+            #: upload.
+            # partial(fixer.metadata_fix, self.metadata_xml_template),
+            fixer.tags_fix,
+            fixer.title_fix,
+            partial(fixer.group_fix, self.groups_dict),
+            partial(fixer.folder_fix, self.folders_dict),
+            fixer.delete_protection_fix,
+            fixer.downloads_fix,
+            partial(fixer.description_note_fix, self.static_note, self.shelved_note),
+            fixer.thumbnail_fix,
+            fixer.authoritative_fix,
+            fixer.visibility_fix,
+            fixer.cache_age_fix,
+        ]
+
+        try:
+            for item_fix in item_fixes:
+                retry(item_fix)
+        finally:
+            #: Send the tags, title, description, and thumbnail changes staged above in a single item.update() call.
+            #: Done even if a later fix failed so the changes already staged (and their results) aren't lost.
+            retry(fixer.update_item_properties)
+
+        return item_report
+
     def fix_items(self, report=False):
         """
         Instantiates an ItemFixer for each item and manually runs the specified
         fix methods using data in self.report_dict. Appends results to
         self.report_dict and writes the whole dictionary to a csv named
         checks_yyyy-mm-dd.csv in 'report_path' (if specified).
+
+        Items are fixed concurrently by self.max_workers threads; summary
+        statistics are tallied in the same order as self.report_dict.
         """
 
         self.log.info(f"Evaluating report for fixes on {len(self.report_dict)} items")
 
-        counter = 0
+        update_status_keys = [
+            # "metadata_result",
+            "tags_result",
+            "title_result",
+            "groups_result",
+            "folder_result",
+            "delete_protection_result",
+            "downloads_result",
+            "description_note_result",
+            "thumbnail_result",
+            "authoritative_result",
+            "visibility_result",
+            "cache_age_result",
+        ]
+
+        itemids = list(self.report_dict)
+        counters = range(1, len(itemids) + 1)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
         try:
-            for itemid in self.report_dict:
-
-                counter += 1
-
-                item = retry(lambda: self.gis.content.get(itemid))  # pylint: disable=no-member,cell-var-from-loop
-                item_report = self.report_dict[itemid]
-
-                if self.verbose:
-                    print(f"Evaluating report for fixes on {item.title} ({counter} of {len(self.report_dict)})...")
-
-                fixer = fixes.ItemFixer(item, item_report)
-
-                #: TODO: add each method and it's args to a list, then iterate through the list (DRY)
-
-                #: Do the metadata fix first so that the tags, title, and
-                #: description fixes later on aren't overwritten by the metadata
-                #: upload.
-                # retry(lambda: fixer.metadata_fix(self.metadata_xml_template))  # pylint: disable=cell-var-from-loop
-                retry(fixer.tags_fix)
-                retry(fixer.title_fix)
-                retry(lambda: fixer.group_fix(self.groups_dict))  # pylint: disable=cell-var-from-loop
-                retry(fixer.folder_fix)
-                retry(fixer.delete_protection_fix)
-                retry(fixer.downloads_fix)
-                retry(
-                    lambda: fixer.description_note_fix(self.static_note, self.shelved_note)
-                )  # pylint: disable=cell-var-from-loop
-                retry(fixer.thumbnail_fix)
-                retry(fixer.authoritative_fix)
-                retry(fixer.visibility_fix)
-                retry(fixer.cache_age_fix)
-
-                update_status_keys = [
-                    # "metadata_result",
-                    "tags_result",
-                    "title_result",
-                    "groups_result",
-                    "folder_result",
-                    "delete_protection_result",
-                    "downloads_result",
-                    "description_note_result",
-                    "thumbnail_result",
-                    "authoritative_result",
-                    "visibility_result",
-                    "cache_age_result",
-                ]
+            for item_report in executor.map(self._fix_item, itemids, counters):
 
                 #: Update summary statistics, print results if verbose
                 for status in update_status_keys:
+                    result = item_report[status]
 
                     #: Skip statuses not updated
-                    if "No update needed for" in item_report[status]:
+                    if "No update needed for" in result:
                         continue
 
                     #: Increment fixed item summary statistic
-                    self.fix_counts.setdefault(status, 0)
                     self.fix_counts[status] += 1
                     #: Log actual fixes
                     if self.verbose:
-                        print(f"\t{item_report[status]}")
+                        print(f"\t{result}")
 
         except KeyboardInterrupt:
             print("Interrupted by Ctrl-c")
             raise
 
         finally:
+            #: Don't start any more items if one of them raised
+            executor.shutdown(cancel_futures=True)
             if report:
                 log_report(self.report_dict, credentials.REPORT_BASE_PATH, rotate_count=credentials.LOG_ROTATE_COUNT)
 
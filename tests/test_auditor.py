@@ -2,8 +2,12 @@ import pytest
 import logging
 
 from collections import namedtuple
+from functools import partial
 
-from auditor.models import Auditor, retry, Metatable
+import requests
+from requests.adapters import HTTPAdapter
+
+from auditor.models import Auditor, log_report, pool_connections, retry, Metatable, MetaRow
 
 
 def test_retry():
@@ -20,9 +24,29 @@ def test_retry():
         retry(inner_retry)
 
 
+def test_retry_returns_value_after_failure(mocker):
+    sleep = mocker.patch('auditor.models.sleep')
+    worker = mocker.Mock(side_effect=[ConnectionError, 'foo'])
+
+    assert retry(worker, verbose=False) == 'foo'
+    assert worker.call_count == 2
+    sleep.assert_called_once()
+
+
+def test_retry_caps_wait_time(mocker):
+    sleep = mocker.patch('auditor.models.sleep')
+    worker = mocker.Mock(side_effect=ConnectionError)
+
+    with pytest.raises(ConnectionError):
+        retry(worker, verbose=False, max_tries=6, max_delay=10)
+
+    assert worker.call_count == 7
+    assert all(call.args[0] < 10 + 3 for call in sleep.call_args_list)
+
+
 def test_read_sgid_metatable_to_dictionary(mocker):
 
-    def return_sgid_row(self, table, fields):
+    def return_sgid_row(self, table, fields, where_clause=None):
         #: table_sgid_name, table_agol_itemid, table_agol_name, table_authoritative
         for row in [['table name', '9d2e949a9492425dbb4e5d5212f9ef19', 'agol title', None]]:
             yield row
@@ -34,13 +58,15 @@ def test_read_sgid_metatable_to_dictionary(mocker):
     test_table = Metatable()
     test_table.read_metatable('something', sgid_fields)
 
-    # '9d2e949a9492425dbb4e5d5212f9ef19': ['SGID.GEOSCIENCE.Minerals', 'Utah Minerals', 'SGID', None],
-    assert test_table.metatable_dict['9d2e949a9492425dbb4e5d5212f9ef19'] == ['table name', 'agol title', 'SGID', None]
+    # '9d2e949a9492425dbb4e5d5212f9ef19': MetaRow('SGID.GEOSCIENCE.Minerals', 'Utah Minerals', 'SGID', None),
+    assert test_table.metatable_dict['9d2e949a9492425dbb4e5d5212f9ef19'] == MetaRow(
+        'table name', 'agol title', 'SGID', None
+    )
 
 
 def test_read_agol_metatable_to_dictionary(mocker):
 
-    def return_agol_row(self, table, fields):
+    def return_agol_row(self, table, fields, where_clause=None):
         #: table_sgid_name, table_agol_itemid, table_agol_name, table_category
         for row in [['table name', 'dd7fa2d78d2547759a50d6f827f8df3a', 'agol title', 'shelved']]:
             yield row
@@ -52,12 +78,26 @@ def test_read_agol_metatable_to_dictionary(mocker):
     test_table = Metatable()
     test_table.read_metatable('something', agol_fields)
 
-    assert test_table.metatable_dict['dd7fa2d78d2547759a50d6f827f8df3a'] == ['table name', 'agol title', 'shelved', 'n']
+    assert test_table.metatable_dict['dd7fa2d78d2547759a50d6f827f8df3a'] == MetaRow(
+        'table name', 'agol title', 'shelved', 'n'
+    )
+
+
+def test_read_metatable_filters_null_itemids_in_cursor(mocker):
+    mocker.patch('arcpy.AddFieldDelimiters', lambda table, field: f'"{field}"')
+    cursor = mocker.patch('auditor.models.Metatable._cursor_wrapper', return_value=[])
+
+    sgid_fields = ['TABLENAME', 'AGOL_ITEM_ID', 'AGOL_PUBLISHED_NAME', 'Authoritative']
+
+    test_table = Metatable()
+    test_table.read_metatable('something', sgid_fields)
+
+    cursor.assert_called_once_with('something', sgid_fields, '"AGOL_ITEM_ID" IS NOT NULL')
 
 
 def test_magic_string_itemid_not_added_to_dictionary(mocker):
 
-    def return_sgid_row(self, table, fields):
+    def return_sgid_row(self, table, fields, where_clause=None):
         #: table_sgid_name, table_agol_itemid, table_agol_name, table_authoritative
         for row in [['table name', 'magic_word', 'agol title', None]]:
             yield row
@@ -75,7 +115,7 @@ def test_magic_string_itemid_not_added_to_dictionary(mocker):
 
 def test_blank_itemid_not_added_to_dictionary(mocker):
 
-    def return_sgid_row(self, table, fields):
+    def return_sgid_row(self, table, fields, where_clause=None):
         #: table_sgid_name, table_agol_itemid, table_agol_name, table_authoritative
         for row in [['table name', '', 'agol title', None]]:
             yield row
@@ -91,9 +131,46 @@ def test_blank_itemid_not_added_to_dictionary(mocker):
     assert test_table.metatable_dict == {}
 
 
-def test_duplicate_itemids_in_same_table_reported_in_list(mocker):
+def test_null_itemid_not_added_to_dictionary(mocker):
+
+    def return_sgid_row(self, table, fields, where_clause=None):
+        #: table_sgid_name, table_agol_itemid, table_agol_name, table_authoritative
+        for row in [['table name', None, 'agol title', None]]:
+            yield row
+
+    sgid_fields = ['TABLENAME', 'AGOL_ITEM_ID', 'AGOL_PUBLISHED_NAME', 'Authoritative']
+
+    mocker.patch('auditor.models.Metatable._cursor_wrapper', return_sgid_row)
+
+    test_table = Metatable()
+    test_table.read_metatable('something', sgid_fields)
+
+    assert test_table.metatable_dict == {}
+
+
+def test_hyphenated_itemid_added_to_dictionary(mocker):
+
+    def return_sgid_row(self, table, fields, where_clause=None):
+        #: table_sgid_name, table_agol_itemid, table_agol_name, table_authoritative
+        for row in [['table name', '9d2e949a-9492-425d-bb4e-5d5212f9ef19', 'agol title', None],
+                    ['other name', '9d2e949a9492425dbb4e5d5212f9ef1', 'too short', None]]:
+            yield row
+
+    sgid_fields = ['TABLENAME', 'AGOL_ITEM_ID', 'AGOL_PUBLISHED_NAME', 'Authoritative']
+
+    mocker.patch('auditor.models.Metatable._cursor_wrapper', return_sgid_row)
+
+    test_table = Metatable()
+    test_table.read_metatable('something', sgid_fields)
+
+    assert test_table.metatable_dict == {
+        '9d2e949a-9492-425d-bb4e-5d5212f9ef19': MetaRow('table name', 'agol title', 'SGID', None)
+    }
+
+
+def test_duplicate_itemids_in_same_table_reported_in_set(mocker):
 
-    def return_sgid_row(self, table, fields):
+    def return_sgid_row(self, table, fields, where_clause=None):
         #: table_sgid_name, table_agol_itemid, table_agol_name, table_authoritative
         for row in [['first table name', '9d2e949a9492425dbb4e5d5212f9ef19', 'first agol title', None],
                     ['second name', '9d2e949a9492425dbb4e5d5212f9ef19', 'second title', None]]:
@@ -107,20 +184,38 @@ def test_duplicate_itemids_in_same_table_reported_in_list(mocker):
     test_table.read_metatable('something', sgid_fields)
 
     #: Our duplicate id should be the only entry in .duplicate_keys and .metatable_dict should just have first item
-    assert test_table.duplicate_keys == ['9d2e949a9492425dbb4e5d5212f9ef19']
-    assert test_table.metatable_dict['9d2e949a9492425dbb4e5d5212f9ef19'] == [
+    assert test_table.duplicate_keys == {'9d2e949a9492425dbb4e5d5212f9ef19'}
+    assert test_table.metatable_dict['9d2e949a9492425dbb4e5d5212f9ef19'] == MetaRow(
         'first table name', 'first agol title', 'SGID', None
-    ]
+    )
 
 
-def test_duplicate_itemids_from_different_tables_reported_in_list(mocker):
+def test_repeated_duplicate_itemid_reported_once(mocker):
 
-    def return_sgid_row(self, table, fields):
+    def return_sgid_row(self, table, fields, where_clause=None):
+        #: table_sgid_name, table_agol_itemid, table_agol_name, table_authoritative
+        for name in ['first', 'second', 'third']:
+            yield [f'{name} table name', '9d2e949a9492425dbb4e5d5212f9ef19', f'{name} agol title', None]
+
+    sgid_fields = ['TABLENAME', 'AGOL_ITEM_ID', 'AGOL_PUBLISHED_NAME', 'Authoritative']
+
+    mocker.patch('auditor.models.Metatable._cursor_wrapper', return_sgid_row)
+
+    test_table = Metatable()
+    test_table.read_metatable('something', sgid_fields)
+
+    assert test_table.duplicate_keys == {'9d2e949a9492425dbb4e5d5212f9ef19'}
+    assert test_table.metatable_dict['9d2e949a9492425dbb4e5d5212f9ef19'].sgid_name == 'first table name'
+
+
+def test_duplicate_itemids_from_different_tables_reported_in_set(mocker):
+
+    def return_sgid_row(self, table, fields, where_clause=None):
         #: table_sgid_name, table_agol_itemid, table_agol_name, table_authoritative
         for row in [['sgid table name', '9d2e949a9492425dbb4e5d5212f9ef19', 'sgid agol title', None]]:
             yield row
 
-    def return_agol_row(self, table, fields):
+    def return_agol_row(self, table, fields, where_clause=None):
         #: table_sgid_name, table_agol_itemid, table_agol_name, table_category
         for row in [['agol table name', '9d2e949a9492425dbb4e5d5212f9ef19', 'agol title', 'shelved']]:
             yield row
@@ -137,10 +232,10 @@ def test_duplicate_itemids_from_different_tables_reported_in_list(mocker):
     test_table.read_metatable('agol something', agol_fields)
 
     #: Our duplicate id should be the only entry in .duplicate_keys and .metatable_dict should just have first item
-    assert test_table.duplicate_keys == ['9d2e949a9492425dbb4e5d5212f9ef19']
-    assert test_table.metatable_dict['9d2e949a9492425dbb4e5d5212f9ef19'] == [
+    assert test_table.duplicate_keys == {'9d2e949a9492425dbb4e5d5212f9ef19'}
+    assert test_table.metatable_dict['9d2e949a9492425dbb4e5d5212f9ef19'] == MetaRow(
         'sgid table name', 'sgid agol title', 'SGID', None
-    ]
+    )
 
 
 def test_org_checker_completes_and_logs(mocker, caplog):
@@ -151,6 +246,7 @@ def test_org_checker_completes_and_logs(mocker, caplog):
     item_list = [agol_item('foo', 1), agol_item('foo', 2)]
 
     mocker.patch('auditor.models.Auditor.setup')
+    mocker.patch('auditor.models.Auditor._read_metatables')
 
     test_auditor = Auditor(cli_logger, verbose=True)
     test_auditor.items_to_check = item_list
@@ -169,6 +265,7 @@ def test_org_checker_reports_no_results(mocker, caplog):
     item_list = [agol_item('foo', 1), agol_item('bar', 2)]
 
     mocker.patch('auditor.models.Auditor.setup')
+    mocker.patch('auditor.models.Auditor._read_metatables')
 
     test_auditor = Auditor(cli_logger, verbose=True)
     test_auditor.items_to_check = item_list
@@ -176,3 +273,307 @@ def test_org_checker_reports_no_results(mocker, caplog):
         test_auditor.check_organization_wide()
 
         assert 'check_for_duplicate_titles returned no results' in caplog.text
+
+
+def test_check_items_reports_results_in_item_order(mocker):
+
+    def fake_check_item(item, counter):
+        if item == 'skipped':
+            return None
+        return item, {'counter': counter}
+
+    mocker.patch('auditor.models.Auditor.setup')
+    mocker.patch('auditor.models.Auditor._read_metatables')
+    mocker.patch.object(Auditor, '_check_item', side_effect=fake_check_item)
+
+    test_auditor = Auditor(logging.getLogger('test'), max_workers=4)
+    test_auditor.items_to_check = ['first', 'skipped', 'third', 'fourth']
+    test_auditor.check_items()
+
+    assert list(test_auditor.report_dict.items()) == [
+        ('first', {'counter': 1}),
+        ('third', {'counter': 3}),
+        ('fourth', {'counter': 4}),
+    ]
+
+
+def test_log_report_writes_header_and_rows(tmp_path):
+
+    report_path = tmp_path / 'report.csv'
+    report_dict = {
+        'item1': {'tags_fix': 'Y', 'tags_new': ['Foo']},
+        'item2': {'tags_fix': 'N', 'tags_new': ''},
+    }
+
+    log_report(report_dict, report_path, rotate_count=1)
+
+    lines = report_path.read_text().splitlines()
+    assert lines[1:] == ['agol_id|tags_fix|tags_new', "item1|Y|['Foo']", 'item2|N|']
+
+
+def test_log_report_replaces_previous_report_handler(tmp_path):
+
+    report_dict = {'item1': {'tags_fix': 'Y'}}
+
+    log_report(report_dict, tmp_path / 'checks.csv', rotate_count=1)
+    log_report(report_dict, tmp_path / 'fixes.csv', rotate_count=1)
+
+    assert (tmp_path / 'checks.csv').read_text().count('item1|Y') == 1
+    assert (tmp_path / 'fixes.csv').read_text().count('item1|Y') == 1
+    assert len(logging.getLogger('audit_report').handlers) == 1
+
+
+def test_pool_connections_keeps_existing_adapter(mocker):
+
+    class ArcgisAdapter(HTTPAdapter):
+        pass
+
+    session = requests.Session()
+    existing_adapter = ArcgisAdapter()
+    session.mount('https://', existing_adapter)
+    gis = mocker.Mock()
+    gis._con._session = session
+
+    pool_connections(gis, pool_size=4)
+
+    assert session.get_adapter('https://') is existing_adapter
+    assert existing_adapter.poolmanager.connection_pool_kw['maxsize'] == 4
+    assert existing_adapter.max_retries.total == 0
+
+
+def test_pool_connections_mounts_adapter_if_session_has_none(mocker):
+    session = requests.Session()
+    session.adapters.clear()
+    gis = mocker.Mock()
+    gis._con._session = session
+
+    pool_connections(gis, pool_size=4)
+
+    assert session.get_adapter('https://')._pool_maxsize == 4
+
+
+def test_pool_connections_clears_old_pool(mocker):
+    session = requests.Session()
+    adapter = session.get_adapter('https://')
+    old_poolmanager = adapter.poolmanager
+    clear = mocker.spy(old_poolmanager, 'clear')
+    gis = mocker.Mock()
+    gis._con._session = session
+
+    pool_connections(gis, pool_size=4)
+
+    clear.assert_called_once_with()
+    assert adapter.poolmanager is not old_poolmanager
+    assert adapter.poolmanager.connection_pool_kw['block'] is False
+
+
+def test_pool_connections_skips_gis_without_session(mocker, caplog):
+    gis = mocker.Mock(spec=['_con'])
+    gis._con = object()
+
+    with caplog.at_level(logging.DEBUG, logger='auditor.models'):
+        pool_connections(gis)
+
+    assert 'connection pool left as-is' in caplog.text
+
+
+def test_fix_items_counts_only_applied_fixes(mocker):
+    status_keys = [
+        'tags_result', 'title_result', 'groups_result', 'folder_result', 'delete_protection_result', 'downloads_result',
+        'description_note_result', 'thumbnail_result', 'authoritative_result', 'visibility_result', 'cache_age_result'
+    ]
+
+    def fake_fix_item(itemid, counter):
+        item_report = {status: 'No update needed for foo' for status in status_keys}
+        if itemid == 'fixed':
+            item_report['tags_result'] = "Updated tags to ['Foo']"
+        return item_report
+
+    mocker.patch('auditor.models.Auditor.setup')
+    mocker.patch('auditor.models.Auditor._read_metatables')
+    mocker.patch.object(Auditor, '_fix_item', side_effect=fake_fix_item)
+
+    test_auditor = Auditor(logging.getLogger('test'), verbose=True)
+    test_auditor.report_dict = {'fixed': {}, 'unchanged': {}}
+    test_auditor.fix_items()
+
+    assert test_auditor.fix_counts == {'tags_result': 1}
+
+
+def test_fix_items_fixes_every_item_with_workers(mocker):
+    status_keys = [
+        'tags_result', 'title_result', 'groups_result', 'folder_result', 'delete_protection_result', 'downloads_result',
+        'description_note_result', 'thumbnail_result', 'authoritative_result', 'visibility_result', 'cache_age_result'
+    ]
+
+    def fake_fix_item(itemid, counter):
+        item_report = {status: 'No update needed for foo' for status in status_keys}
+        item_report['tags_result'] = f'Updated tags on item {counter}'
+        return item_report
+
+    mocker.patch('auditor.models.Auditor.setup')
+    mocker.patch('auditor.models.Auditor._read_metatables')
+    fix_item = mocker.patch.object(Auditor, '_fix_item', side_effect=fake_fix_item)
+
+    test_auditor = Auditor(logging.getLogger('test'), verbose=True, max_workers=4)
+    test_auditor.report_dict = {str(i): {} for i in range(10)}
+    test_auditor.fix_items()
+
+    assert sorted(fix_item.call_args_list) == sorted(mocker.call(str(i), i + 1) for i in range(10))
+    assert test_auditor.fix_counts == {'tags_result': 10}
+
+
+def test_fix_item_runs_fixes_in_order_and_updates_properties_last(mocker):
+    fixer = mocker.patch('auditor.fixes.ItemFixer').return_value
+
+    mocker.patch('auditor.models.Auditor.setup')
+    mocker.patch('auditor.models.Auditor._read_metatables')
+    test_auditor = Auditor(logging.getLogger('test'))
+    test_auditor.gis = mocker.Mock()
+    test_auditor.report_dict = {'foo': {}}
+    test_auditor._fix_item('foo', 1)
+
+    fix_names = [name for name, _, _ in fixer.method_calls]
+    assert fix_names[:3] == ['tags_fix', 'title_fix', 'group_fix']
+    assert fix_names[-1] == 'update_item_properties'
+    fixer.group_fix.assert_called_once_with(test_auditor.groups_dict)
+    fixer.folder_fix.assert_called_once_with(test_auditor.folders_dict)
+
+
+def test_fix_item_updates_staged_properties_when_later_fix_fails(mocker):
+    mocker.patch('auditor.models.sleep')
+    fixer = mocker.patch('auditor.fixes.ItemFixer').return_value
+    fixer.folder_fix.side_effect = Exception('folder move failed')
+
+    mocker.patch('auditor.models.Auditor.setup')
+    mocker.patch('auditor.models.Auditor._read_metatables')
+    test_auditor = Auditor(logging.getLogger('test'))
+    test_auditor.gis = mocker.Mock()
+    test_auditor.report_dict = {'foo': {}}
+
+    with pytest.raises(Exception, match='folder move failed'):
+        test_auditor._fix_item('foo', 1)
+
+    fixer.tags_fix.assert_called_once_with()
+    fixer.title_fix.assert_called_once_with()
+    fixer.update_item_properties.assert_called_once_with()
+    fixer.downloads_fix.assert_not_called()
+
+
+def test_setup_lists_feature_services_from_every_folder(mocker):
+    item = namedtuple('Item', ['itemid', 'type'])
+    folder_items = {
+        None: [item('root_fs', 'Feature Service'), item('root_map', 'Web Map')],
+        'Water': [item('water_fs', 'Feature Service')],
+    }
+    gis = mocker.patch('arcgis.gis.GIS').return_value
+    gis.users.me.folders = [{'id': 'water_id', 'title': 'Water'}]
+    gis.users.me.items.side_effect = lambda folder, max_items: folder_items[folder]
+    water_group = mocker.Mock()
+    water_group.title = 'Utah SGID Water'
+    gis.groups.search.return_value = [water_group]
+    mocker.patch('auditor.models.pool_connections')
+    mocker.patch('arcpy.SignInToPortal')
+    mocker.patch('arcpy.GetActivePortalURL')
+    mocker.patch('auditor.models.Path.exists', return_value=True)
+
+    real_setup = Auditor.setup
+    mocker.patch.object(Auditor, 'setup')
+    mocker.patch.object(Auditor, '_read_metatables')
+    test_auditor = Auditor(logging.getLogger('test'), max_workers=4)
+    real_setup(test_auditor)
+
+    assert [item.itemid for item in test_auditor.items_to_check] == ['root_fs', 'water_fs']
+    assert test_auditor.itemid_and_folder == {'root_fs': None, 'water_fs': 'Water'}
+    assert test_auditor.groups_dict == {'utah sgid water': water_group}
+
+
+def test_setup_retry_only_lists_folders_not_already_listed(mocker):
+
+    class FakeItem(dict):
+
+        def __init__(self, gis, itemid, itemdict):
+            super().__init__(itemdict)
+            self._gis = gis
+            self.itemid = itemid
+            self.type = itemdict['type']
+
+    calls = []
+    first_gis, second_gis = mocker.Mock(), mocker.Mock()
+
+    def list_items(gis, folder, max_items):
+        calls.append(folder)
+        if folder == 'Water' and calls.count('Water') == 1:
+            raise Exception('timed out')
+        return [FakeItem(gis, f'{folder}_fs', {'type': 'Feature Service'})]
+
+    for gis in (first_gis, second_gis):
+        gis.users.me.folders = [{'id': 'water_id', 'title': 'Water'}]
+        gis.users.me.items.side_effect = partial(list_items, gis)
+        gis.groups.search.return_value = []
+    mocker.patch('arcgis.gis.GIS', side_effect=[first_gis, second_gis])
+    mocker.patch('arcgis.gis.Item', FakeItem)
+    mocker.patch('auditor.models.pool_connections')
+    mocker.patch('arcpy.SignInToPortal')
+    mocker.patch('arcpy.GetActivePortalURL')
+    mocker.patch('auditor.models.Path.exists', return_value=True)
+    mocker.patch('auditor.models.sleep')
+
+    real_setup = Auditor.setup
+    mocker.patch.object(Auditor, 'setup')
+    mocker.patch.object(Auditor, '_read_metatables')
+    test_auditor = Auditor(logging.getLogger('test'), max_workers=1)
+    retry(partial(real_setup, test_auditor), verbose=False)
+
+    assert calls == [None, 'Water', 'Water']
+    assert [item.itemid for item in test_auditor.items_to_check] == ['None_fs', 'Water_fs']
+    #: The root folder's items were listed on the first GIS but should now use the one from the successful attempt
+    assert all(item._gis is second_gis for item in test_auditor.items_to_check)
+    assert test_auditor._folder_items == {}
+
+
+def test_init_reads_metatables_once_after_setup_retries(mocker):
+    mocker.patch('auditor.models.sleep')
+    setup = mocker.patch.object(Auditor, 'setup', side_effect=[Exception('timed out'), None])
+    read_metatables = mocker.patch.object(Auditor, '_read_metatables')
+
+    Auditor(logging.getLogger('test'))
+
+    assert setup.call_count == 2
+    read_metatables.assert_called_once_with()
+
+
+def test_read_metatables_raises_on_duplicate_ids(mocker):
+    metatable = mocker.patch('auditor.models.Metatable').return_value
+    metatable.duplicate_keys = {'b', 'a'}
+
+    real_read_metatables = Auditor._read_metatables
+    mocker.patch.object(Auditor, 'setup')
+    mocker.patch.object(Auditor, '_read_metatables')
+    test_auditor = Auditor(logging.getLogger('test'))
+
+    with pytest.raises(RuntimeError, match=r"\['a', 'b'\]"):
+        real_read_metatables(test_auditor)
+
+    assert [call.args[0] for call in metatable.read_metatable.call_args_list] == [
+        test_auditor.sgid_table, test_auditor.agol_table
+    ]
+
+
+def test_setup_sizes_connection_pool_for_workers(mocker):
+    gis = mocker.patch('arcgis.gis.GIS').return_value
+    gis.users.me.folders = []
+    gis.users.me.items.return_value = []
+    gis.groups.search.return_value = []
+    pool_connections = mocker.patch('auditor.models.pool_connections')
+    mocker.patch('arcpy.SignInToPortal')
+    mocker.patch('arcpy.GetActivePortalURL')
+    mocker.patch('auditor.models.Path.exists', return_value=True)
+
+    real_setup = Auditor.setup
+    mocker.patch.object(Auditor, 'setup')
+    mocker.patch.object(Auditor, '_read_metatables')
+    test_auditor = Auditor(logging.getLogger('test'), max_workers=64)
+    real_setup(test_auditor)
+
+    pool_connections.assert_called_once_with(gis, 64)
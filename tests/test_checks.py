@@ -7,7 +7,7 @@ from pathlib import Path
 
 from auditor import credentials
 from auditor import checks
-from auditor.models import Auditor
+from auditor.models import Auditor, MetaRow
 
 # @pytest.fixture
 # def agol_item():
@@ -37,7 +37,7 @@ class TestTagCheck:
         item_checker.item.tags = ['AGRC', 'Bar']
         item_checker.new_tags = []
         item_checker.results_dict = {}
-        item_checker.arcpy_metadata = False
+        item_checker.metadata_tags = []
         item_checker.new_group = False
 
         checks.ItemChecker.tags_check(item_checker, Auditor.tags_to_delete, Auditor.uppercased_tags, Auditor.articles)
@@ -50,7 +50,7 @@ class TestTagCheck:
         item_checker.item.tags = []
         item_checker.new_tags = []
         item_checker.results_dict = {}
-        item_checker.arcpy_metadata = False
+        item_checker.metadata_tags = []
         item_checker.new_group = 'Utah SGID Bar'
 
         checks.ItemChecker.tags_check(item_checker, Auditor.tags_to_delete, Auditor.uppercased_tags, Auditor.articles)
@@ -63,7 +63,7 @@ class TestTagCheck:
         item_checker.item.tags = ['AGRC', 'Bar']
         item_checker.new_tags = []
         item_checker.results_dict = {}
-        item_checker.arcpy_metadata = False
+        item_checker.metadata_tags = []
         item_checker.new_group = 'Utah SGID Bar'
 
         checks.ItemChecker.tags_check(item_checker, Auditor.tags_to_delete, Auditor.uppercased_tags, Auditor.articles)
@@ -74,18 +74,115 @@ class TestTagCheck:
             'tags_new': ['Bar', 'SGID', 'UGRC']
         }
 
+    def test_reordered_tags_not_fixed(self, mocker):
+        item_checker = mocker.Mock()
+        item_checker.title_from_metatable = 'Utah Foo'
+        item_checker.item.tags = ['UGRC', 'SGID', 'Bar']
+        item_checker.new_tags = []
+        item_checker.results_dict = {}
+        item_checker.metadata_tags = []
+        item_checker.new_group = 'Utah SGID Bar'
+
+        checks.ItemChecker.tags_check(item_checker, Auditor.tags_to_delete, Auditor.uppercased_tags, Auditor.articles)
+
+        assert item_checker.results_dict == {'tags_fix': 'N', 'tags_old': ['UGRC', 'SGID', 'Bar'], 'tags_new': ''}
+
+    def test_duplicate_tags_fixed(self, mocker):
+        item_checker = mocker.Mock()
+        item_checker.title_from_metatable = 'Utah Foo'
+        item_checker.item.tags = ['Bar', 'Bar']
+        item_checker.new_tags = []
+        item_checker.results_dict = {}
+        item_checker.metadata_tags = []
+        item_checker.new_group = False
+
+        checks.ItemChecker.tags_check(item_checker, Auditor.tags_to_delete, Auditor.uppercased_tags, Auditor.articles)
+
+        assert item_checker.results_dict == {'tags_fix': 'Y', 'tags_old': ['Bar', 'Bar'], 'tags_new': ['Bar']}
+
+
+    def test_multi_word_tag_in_title_removed(self, mocker):
+        item_checker = mocker.Mock()
+        item_checker.title_from_metatable = 'Utah Cycle Net'
+        item_checker.item.tags = ['Cycle Net', 'Bar']
+        item_checker.new_tags = []
+        item_checker.results_dict = {}
+        item_checker.metadata_tags = []
+        item_checker.new_group = False
+
+        checks.ItemChecker.tags_check(item_checker, Auditor.tags_to_delete, Auditor.uppercased_tags, Auditor.articles)
+
+        assert item_checker.results_dict['tags_new'] == ['Bar']
+
+    def test_multi_word_tag_inside_title_word_kept(self, mocker):
+        item_checker = mocker.Mock()
+        item_checker.title_from_metatable = 'Utah Bicycle Network'
+        item_checker.item.tags = ['Cycle Net', 'Bar']
+        item_checker.new_tags = []
+        item_checker.results_dict = {}
+        item_checker.metadata_tags = []
+        item_checker.new_group = False
+
+        checks.ItemChecker.tags_check(item_checker, Auditor.tags_to_delete, Auditor.uppercased_tags, Auditor.articles)
+
+        assert item_checker.results_dict == {'tags_fix': 'N', 'tags_old': ['Cycle Net', 'Bar'], 'tags_new': ''}
+
+
+    def test_metadata_tags_added(self, mocker):
+        item_checker = mocker.Mock()
+        item_checker.title_from_metatable = 'Utah Foo'
+        item_checker.item.tags = ['Bar']
+        item_checker.new_tags = []
+        item_checker.results_dict = {}
+        item_checker.metadata_tags = ['baz', 'Bar']
+        item_checker.new_group = False
+
+        checks.ItemChecker.tags_check(item_checker, Auditor.tags_to_delete, Auditor.uppercased_tags, Auditor.articles)
+
+        assert item_checker.results_dict == {'tags_fix': 'Y', 'tags_old': ['Bar'], 'tags_new': ['Bar', 'Baz']}
+
+    def test_decomposed_unicode_tag_not_fixed(self, mocker):
+        item_checker = mocker.Mock()
+        item_checker.title_from_metatable = 'Utah Foo'
+        item_checker.item.tags = ['Cafe\u0301']
+        item_checker.new_tags = []
+        item_checker.results_dict = {}
+        item_checker.metadata_tags = []
+        item_checker.new_group = False
+
+        checks.ItemChecker.tags_check(item_checker, Auditor.tags_to_delete, Auditor.uppercased_tags, Auditor.articles)
+
+        assert item_checker.results_dict == {'tags_fix': 'N', 'tags_old': ['Cafe\u0301'], 'tags_new': ''}
+
+    def test_compatibility_characters_kept_in_new_tags(self, mocker):
+        item_checker = mocker.Mock()
+        item_checker.title_from_metatable = 'Utah Foo'
+        item_checker.item.tags = ['H\u2082O', 'Brand\u2122', 'AGRC']
+        item_checker.new_tags = []
+        item_checker.results_dict = {}
+        item_checker.metadata_tags = []
+        item_checker.new_group = False
+
+        checks.ItemChecker.tags_check(item_checker, Auditor.tags_to_delete, Auditor.uppercased_tags, Auditor.articles)
+
+        assert item_checker.results_dict == {
+            'tags_fix': 'Y',
+            'tags_old': ['H\u2082O', 'Brand\u2122', 'AGRC'],
+            'tags_new': ['H\u2082O', 'Brand\u2122'],
+        }
+
 
 class TestGroupFromTable:
 
     def test_get_group_from_table_shelved_item(self):
-        metable_row = ('SGID.Foo.Bar', '', 'shelved', '')
+        metable_row = MetaRow('SGID.Foo.Bar', '', 'shelved', '')
 
         group = checks.get_group_from_table(metable_row)
 
         assert group == 'UGRC Shelf'
 
     def test_get_group_from_table_sgid_item(self):
-        metable_row = ('SGID.Foo.Bar', '', '', '')
+        metable_row = MetaRow('SGID.Foo.Bar', '', '', '')
 
         group = checks.get_group_from_table(metable_row)
 
@@ -118,13 +215,69 @@ class TestSetup:
 
         assert item_checker.static_shelved == 'shelved'
 
+    def test_setup_reads_metatable_entry(self, mocker):
+        mocker.patch('arcpy.Exists', return_value=False)
+        item_checker = mocker.Mock()
+        item_checker.item.itemid = '0'
+        item_checker.metatable_dict = {'0': MetaRow('SGID.WATER.Stations', 'Utah Stations', 'static', 'd')}
+        item_checker.results_dict = {}
+
+        checks.ItemChecker.setup(item_checker, 'foo')
+
+        assert item_checker.in_sgid is True
+        assert item_checker.title_from_metatable == 'Utah Stations'
+        assert item_checker.new_group == 'Utah SGID Water'
+        assert item_checker.new_folder == 'Water'
+        assert item_checker.authoritative == 'deprecated'
+        assert item_checker.static_shelved == 'static'
+        assert item_checker.results_dict == {'SGID_Name': 'SGID.WATER.Stations'}
+
+    def test_setup_does_not_read_metadata(self, mocker):
+        exists = mocker.patch('arcpy.Exists')
+        item_checker = mocker.Mock()
+        item_checker.item.itemid = '0'
+        item_checker.metatable_dict = {'0': MetaRow('SGID.WATER.Stations', 'Utah Stations', 'SGID', 'y')}
+        item_checker.results_dict = {}
+
+        checks.ItemChecker.setup(item_checker, 'foo')
+
+        exists.assert_not_called()
+
+    def test_metadata_tags_parsed_from_fc_metadata(self, mocker):
+        item_checker = mocker.Mock()
+        item_checker.fc_metadata.tags = 'Water, Stations, '
+
+        assert checks.ItemChecker.metadata_tags.func(item_checker) == ['Water', 'Stations']
+
+    def test_fc_metadata_none_for_missing_feature_class(self, mocker):
+        mocker.patch('arcpy.Exists', return_value=False)
+        item_checker = mocker.Mock()
+        item_checker.feature_class_path = Path('foo', 'SGID.WATER.Stations')
+
+        assert checks.ItemChecker.fc_metadata.func(item_checker) is None
+
 
 class TestMetadata:
 
+    def test_fc_metadata_loaded_once_per_path(self, mocker):
+        metadata = mocker.patch('arcpy.metadata.Metadata')
+        metadata.return_value.xml = '<metadata />'
+        metadata.return_value.tags = 'Water, Stations'
+        checks.get_fc_metadata.cache_clear()
+
+        first = checks.get_fc_metadata('foo/SGID.WATER.Stations')
+        second = checks.get_fc_metadata('foo/SGID.WATER.Stations')
+
+        assert first is second
+        #: Only the strings are kept, not the arcpy Metadata object
+        assert first == checks.FCMetadata('<metadata />', 'Water, Stations')
+        metadata.assert_called_once_with('foo/SGID.WATER.Stations')
+        checks.get_fc_metadata.cache_clear()
+
     def test_metadata_check_sets_shelved_note(self, mocker):
         item_checker = mocker.Mock()
-        # item_checker.arcpy_metadata = True
-        item_checker.arcpy_metadata.xml = 'foo'
+        # item_checker.fc_metadata = True
+        item_checker.fc_metadata.xml = 'foo'
         item_checker.item.metadata = 'bar'
         item_checker.new_group = 'UGRC Shelf'
         item_checker.feature_class_path = 'baz'
@@ -140,6 +293,30 @@ class TestMetadata:
         }
 
 
+    def test_metadata_check_sets_static_note(self, mocker):
+        item_checker = mocker.Mock()
+        item_checker.fc_metadata.xml = 'foo'
+        item_checker.item.metadata = 'bar'
+        item_checker.new_group = 'Utah SGID Water'
+        item_checker.static_shelved = 'static'
+        item_checker.feature_class_path = 'baz'
+        item_checker.results_dict = {}
+
+        checks.ItemChecker.metadata_check(item_checker)
+
+        assert item_checker.results_dict['metadata_note'] == 'static'
+
+    def test_metadata_check_no_fix_when_metadata_matches(self, mocker):
+        item_checker = mocker.Mock()
+        item_checker.fc_metadata = checks.FCMetadata('bar', '')
+        item_checker.item.metadata = 'bar'
+        item_checker.results_dict = {}
+
+        checks.ItemChecker.metadata_check(item_checker)
+
+        assert item_checker.results_dict['metadata_fix'] == 'N'
+
+
 def test_lowercase_abbreviation_to_uppercase():
     test_tag = 'udot'
     cased = checks.tag_case(test_tag, Auditor.uppercased_tags, Auditor.articles)
@@ -164,6 +341,12 @@ def test_integrated_tag_check():
     assert cased == 'US Bureau of Geoinformation'
 
 
+def test_hyphenated_tag_title_cased():
+    test_tag = 'water-related'
+    cased = checks.tag_case(test_tag, Auditor.uppercased_tags, Auditor.articles)
+    assert cased == 'Water-Related'
+
+
 # def test_meta_tag_removal():
 #     test_tag = 'Required: Common-Use Word Or Phrase Used To Describe the Subject of the Data Set'
 
@@ -203,6 +386,63 @@ def test_max_age_ignores_non_sgid_item(mocker):
     assert item.results_dict == {'cache_age_fix': 'N', 'cache_age_old': '', 'cache_age_new': ''}
 
 
+def test_downloads_check_flags_missing_extract(mocker):
+
+    item = mocker.Mock()
+    item.in_sgid = True
+    item.properties = {'capabilities': 'Query,Sync'}
+    item.results_dict = {}
+
+    checks.ItemChecker.downloads_check(item)
+
+    assert item.results_dict == {
+        'downloads_fix': 'Y',
+        'downloads_old': 'Query,Sync',
+        'downloads_new': 'Query,Sync,Extract',
+    }
+    assert item.downloads is True
+
+
+def test_downloads_check_ignores_existing_extract(mocker):
+
+    item = mocker.Mock()
+    item.in_sgid = True
+    item.downloads = False
+    item.properties = {'capabilities': 'Query, Extract'}
+    item.results_dict = {}
+
+    checks.ItemChecker.downloads_check(item)
+
+    assert item.results_dict == {'downloads_fix': 'N', 'downloads_old': '', 'downloads_new': ''}
+    assert item.downloads is False
+
+
+def test_groups_check_reports_unreadable_sharing(mocker):
+
+    item_checker = mocker.Mock()
+    item_checker.item.shared_with = RuntimeError('sharing lookup failed')
+    item_checker.new_group = 'Utah SGID Water'
+    item_checker.results_dict = {}
+
+    checks.ItemChecker.groups_check(item_checker, {})
+
+    assert item_checker.results_dict == {'groups_fix': 'N', 'groups_old': "Can't get group", 'group_new': ''}
+
+
+def test_groups_check_handles_group_named_error(mocker):
+
+    error_group = mocker.Mock()
+    error_group.title = 'Error'
+    item_checker = mocker.Mock()
+    item_checker.item.shared_with = {'groups': [error_group]}
+    item_checker.new_group = 'Utah SGID Water'
+    item_checker.results_dict = {}
+
+    checks.ItemChecker.groups_check(item_checker, {})
+
+    assert item_checker.results_dict == {'groups_fix': 'Y', 'groups_old': ['Error'], 'group_new': 'Utah SGID Water'}
+
+
 def test_shelved_item_propercased_gets_shelved_thumbnail(mocker):
 
     item = mocker.Mock()
@@ -336,3 +576,68 @@ def test_deprecated_not_added_to_existing_title_if_already_prefixes_title(mocker
     checks.ItemChecker.title_check(item_checker)
 
     assert item_checker.results_dict == {'title_fix': 'N', 'title_old': '{Deprecated} current', 'title_new': ''}
+
+
+def test_groups_check_handles_missing_groups_key(mocker):
+    item_checker = mocker.Mock()
+    item_checker.results_dict = {}
+    item_checker.item.shared_with = {'everyone': True}
+    item_checker.new_group = 'UGRC: SGID Water'
+
+    checks.ItemChecker.groups_check(item_checker, {})
+
+    assert item_checker.results_dict == {'groups_fix': 'Y', 'groups_old': [], 'group_new': 'UGRC: SGID Water'}
+
+
+def test_groups_check_matches_group_title_case_insensitively(mocker):
+    water_group = mocker.Mock()
+    water_group.title = 'Utah SGID Water'
+    item_checker = mocker.Mock()
+    item_checker.results_dict = {}
+    item_checker.item.shared_with = {'groups': [water_group]}
+    item_checker.new_group = 'Utah SGID WATER'
+
+    checks.ItemChecker.groups_check(item_checker, {'utah sgid water': water_group})
+
+    assert item_checker.results_dict == {'groups_fix': 'N', 'groups_old': '', 'group_new': ''}
+
+
+def test_groups_check_reports_org_group_title(mocker):
+    water_group = mocker.Mock()
+    water_group.title = 'Utah SGID Water'
+    item_checker = mocker.Mock()
+    item_checker.results_dict = {}
+    item_checker.item.shared_with = {'groups': []}
+    item_checker.new_group = 'Utah SGID WATER'
+
+    checks.ItemChecker.groups_check(item_checker, {'utah sgid water': water_group})
+
+    assert item_checker.results_dict == {'groups_fix': 'Y', 'groups_old': [], 'group_new': 'Utah SGID Water'}
+
+
+def test_title_differing_only_in_unicode_form_not_updated(mocker):
+    item_checker = mocker.Mock()
+    item_checker.title_from_metatable = 'Utah Caf\u00e9s'
+    item_checker.item.title = 'Utah Cafe\u0301s'
+    item_checker.results_dict = {}
+
+    checks.ItemChecker.title_check(item_checker)
+
+    assert item_checker.results_dict == {'title_fix': 'N', 'title_old': 'Utah Cafe\u0301s', 'title_new': ''}
+
+
+def test_visibility_check_stops_at_first_hidden_layer(mocker):
+    hidden_layer = mocker.Mock()
+    hidden_layer.manager.properties = {'defaultVisibility': False}
+    unchecked_layer = mocker.Mock()
+    unchecked_manager = mocker.PropertyMock()
+    type(unchecked_layer).manager = unchecked_manager
+    item_checker = mocker.Mock()
+    item_checker.item.layers = [hidden_layer, unchecked_layer]
+    item_checker.set_visibility = False
+    item_checker.results_dict = {}
+
+    checks.ItemChecker.visibility_check(item_checker)
+
+    assert item_checker.results_dict == {'visibility_fix': 'Y'}
+    unchecked_manager.assert_not_called()
@@ -0,0 +1,36 @@
+import pytest
+
+from auditor import cli
+
+
+@pytest.mark.parametrize('workers', ['0', '-1', 'abc'])
+def test_cli_rejects_bad_workers(mocker, capsys, workers):
+    mocker.patch('sys.argv', ['auditor', 'spot', '--workers', workers])
+    auditor = mocker.patch('auditor.cli.Auditor')
+
+    cli.cli()
+
+    assert '*** Invalid input ***' in capsys.readouterr().out
+    auditor.assert_not_called()
+
+
+def test_cli_passes_workers_to_auditor(mocker):
+    mocker.patch('sys.argv', ['auditor', 'spot', '--dry', '--workers', '16'])
+    auditor = mocker.patch('auditor.cli.Auditor')
+
+    cli.cli()
+
+    assert auditor.call_args.args[3] == 16
+
+
+def test_scheduled_cli_checks_one_item_at_a_time_by_default(mocker):
+    mocker.patch('sys.argv', ['auditor', 'scheduled'])
+    mocker.patch('auditor.cli.credentials', spec=['REPORT_BASE_PATH', 'SENDGRID_SETTINGS'])
+    mocker.patch('auditor.cli.Supervisor')
+    mocker.patch('auditor.cli.SendGridHandler')
+    mocker.patch('auditor.cli.pkg_resources')
+    auditor = mocker.patch('auditor.cli.Auditor')
+
+    cli.cli()
+
+    assert auditor.call_args.kwargs['max_workers'] == 1
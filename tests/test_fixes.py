@@ -1,3 +1,6 @@
+from pathlib import Path
+
+from auditor import fixes
 from auditor.fixes import ItemFixer
 
 
@@ -56,3 +59,285 @@ def test_cache_age_reports_failed_fix(mocker):
     ItemFixer.cache_age_fix(fixer_item)
 
     assert fixer_item.item_report['cache_age_result'] == 'Failed to set cacheMaxAge to 5'
+
+
+def test_tags_and_title_fixes_sent_in_one_update(mocker):
+    item = mocker.Mock()
+    item.tags = []
+    item.update.return_value = True
+    fixer = ItemFixer(item, {'tags_new': ['Foo'], 'title_new': 'Bar'})
+
+    fixer.tags_fix()
+    fixer.title_fix()
+    fixer.update_item_properties()
+
+    item.update.assert_called_once_with(item_properties={'tags': ['Foo'], 'title': 'Bar'})
+    assert fixer.item_report['tags_result'] == "Updated tags to ['Foo']"
+    assert fixer.item_report['title_result'] == "Updated title to 'Bar'"
+
+
+def test_failed_update_reported_for_each_staged_fix(mocker):
+    item = mocker.Mock()
+    item.tags = []
+    item.update.return_value = False
+    fixer = ItemFixer(item, {'tags_new': ['Foo'], 'title_new': 'Bar'})
+
+    fixer.tags_fix()
+    fixer.title_fix()
+    fixer.update_item_properties()
+
+    assert fixer.item_report['tags_result'] == "Failed to update tags to ['Foo']"
+    assert fixer.item_report['title_result'] == "Failed to update title to 'Bar'"
+
+
+def test_update_item_properties_skips_update_with_nothing_staged(mocker):
+    item = mocker.Mock()
+    fixer = ItemFixer(item, {'tags_new': '', 'title_new': ''})
+
+    fixer.tags_fix()
+    fixer.title_fix()
+    fixer.update_item_properties()
+
+    item.update.assert_not_called()
+    assert fixer.item_report['tags_result'] == 'No update needed for tags'
+
+
+def test_description_and_thumbnail_fixes_sent_with_tags(mocker):
+    item = mocker.Mock()
+    item.tags = []
+    item.update.return_value = True
+    item.description = 'desc'
+    fixer = ItemFixer(
+        item, {
+            'tags_new': ['Foo'],
+            'description_note_fix': 'Y',
+            'description_note_source': 'static',
+            'thumbnail_fix': 'Y',
+            'thumbnail_path': 'thumb.png',
+        }
+    )
+
+    fixer.tags_fix()
+    fixer.description_note_fix('<p>static</p>', '<p>shelved</p>')
+    fixer.thumbnail_fix()
+    fixer.update_item_properties()
+
+    item.update.assert_called_once_with(
+        item_properties={'tags': ['Foo'], 'description': '<p>static</p><div><br />desc'}, thumbnail='thumb.png'
+    )
+    assert fixer.item_report['description_note_result'] == 'static note added to description'
+    assert fixer.item_report['thumbnail_result'] == 'Thumbnail updated from thumb.png'
+
+
+def test_downloads_fix_uses_capabilities_from_check(mocker):
+    mock_manager = mocker.Mock()
+    mock_manager.update_definition.return_value = {'success': True}
+    mocker.patch('arcgis.features.FeatureLayerCollection.fromitem', return_value=mocker.Mock(manager=mock_manager))
+
+    fixer = ItemFixer(mocker.Mock(), {'downloads_fix': 'Y', 'downloads_new': 'Query,Extract'})
+    fixer.downloads_fix()
+
+    mock_manager.update_definition.assert_called_once_with({'capabilities': 'Query,Extract'})
+    assert fixer.item_report['downloads_result'] == 'Downloads enabled'
+
+
+def _patch_metadata_export(mocker, tmp_path, xml):
+    mocker.patch('arcpy.env.scratchFolder', str(tmp_path))
+    (tmp_path / 'auditor').mkdir()
+    mocker.patch('auditor.fixes.export_fc_metadata', return_value=xml)
+    return mocker.patch('auditor.fixes.get_fc_metadata').return_value
+
+
+def test_metadata_fix_doesnt_read_metadata_back_by_default(mocker, tmp_path):
+    _patch_metadata_export(mocker, tmp_path, '<metadata />')
+    item = mocker.Mock()
+    item.itemid = 'foo'
+    item.update.return_value = True
+    item_metadata = mocker.PropertyMock()
+    type(item).metadata = item_metadata
+    fixer = ItemFixer(item, {'metadata_fix': 'Y', 'metadata_new': 'bar'})
+
+    fixer.metadata_fix('template.xslt')
+
+    item_metadata.assert_not_called()
+    assert fixer.item_report['metadata_result'] == "Metadata updated from 'bar'; successfully reapplied tags"
+
+
+def test_metadata_fix_uploads_exported_metadata_file(mocker, tmp_path):
+    _patch_metadata_export(mocker, tmp_path, '<metadata />')
+    item = mocker.Mock()
+    item.itemid = 'foo'
+    item.update.side_effect = lambda *args, **kwargs: (
+        'metadata' not in kwargs or Path(kwargs['metadata']).read_text(encoding='utf-8') == '<metadata />'
+    )
+    fixer = ItemFixer(item, {'metadata_fix': 'Y', 'metadata_new': 'bar'})
+
+    fixer.metadata_fix('template.xslt')
+
+    item.update.assert_any_call(metadata=str(tmp_path / 'auditor' / 'foo_0.xml'))
+    assert fixer.item_report['metadata_result'] == "Metadata updated from 'bar'; successfully reapplied tags"
+
+
+def test_export_fc_metadata_caches_text_not_metadata_objects(mocker, tmp_path):
+    mocker.patch('arcpy.env.scratchFolder', str(tmp_path))
+    metadata = mocker.patch('arcpy.metadata.Metadata')
+    metadata.return_value.saveAsUsingCustomXSLT.side_effect = lambda path, template: Path(path).write_text(template)
+    fixes.export_fc_metadata.cache_clear()
+
+    first = fixes.export_fc_metadata('foo/SGID.WATER.Stations', 'a.xslt')
+    second = fixes.export_fc_metadata('foo/SGID.WATER.Stations', 'a.xslt')
+    other_template = fixes.export_fc_metadata('foo/SGID.WATER.Stations', 'b.xslt')
+
+    assert first == second == 'a.xslt'
+    assert other_template == 'b.xslt'
+    assert metadata.call_count == 2
+    assert list(tmp_path.iterdir()) == []
+    fixes.export_fc_metadata.cache_clear()
+
+
+def test_metadata_fix_verify_compares_uploaded_metadata(mocker, tmp_path):
+    _patch_metadata_export(mocker, tmp_path, '<metadata />').xml = '<metadata />'
+    item = mocker.Mock()
+    item.itemid = 'foo'
+    item.update.return_value = True
+    item.metadata = '<other />'
+    fixer = ItemFixer(item, {'metadata_fix': 'Y', 'metadata_new': 'bar'})
+
+    fixer.metadata_fix('template.xslt', verify=True)
+
+    assert fixer.item_report['metadata_result'] == (
+        "Tried to update metadata from 'bar'; verify manually; successfully reapplied tags"
+    )
+
+
+def test_downloads_fix_reads_capabilities_when_not_in_report(mocker):
+    mock_manager = mocker.Mock()
+    mock_manager.properties = {'capabilities': 'Query'}
+    mock_manager.update_definition.return_value = {'success': True}
+    mocker.patch('arcgis.features.FeatureLayerCollection.fromitem', return_value=mocker.Mock(manager=mock_manager))
+
+    fixer = ItemFixer(mocker.Mock(), {'downloads_fix': 'Y'})
+    fixer.downloads_fix()
+
+    mock_manager.update_definition.assert_called_once_with({'capabilities': 'Query,Extract'})
+
+
+def test_fix_skipped_when_check_flag_missing(mocker):
+    fixer = ItemFixer(mocker.Mock(), {})
+
+    fixer.delete_protection_fix()
+
+    fixer.item.protect.assert_not_called()
+    assert fixer.item_report['delete_protection_result'] == 'No update needed for delete protection'
+
+
+def test_lowercase_fix_flag_runs_fix(mocker):
+    item = mocker.Mock()
+    item.protect.return_value = {'success': True}
+    fixer = ItemFixer(item, {'delete_protection_fix': 'y'})
+
+    fixer.delete_protection_fix()
+
+    assert fixer.item_report['delete_protection_result'] == 'Item protected'
+
+
+def test_group_fix_uses_prefetched_group(mocker):
+    item = mocker.Mock()
+    group = mocker.Mock()
+    fixer = ItemFixer(item, {'groups_fix': 'Y', 'group_new': 'Utah SGID Water'})
+
+    fixer.group_fix({'utah sgid water': group})
+
+    item.sharing.groups.add.assert_called_once_with(group)
+    item._gis.groups.search.assert_not_called()
+
+
+def test_group_fix_reports_missing_group(mocker):
+    fixer = ItemFixer(mocker.Mock(), {'groups_fix': 'Y', 'group_new': 'Utah SGID Water'})
+
+    fixer.group_fix({})
+
+    assert fixer.item_report['groups_result'] == "Cannot find group 'Utah SGID Water' in organization"
+
+
+def test_folder_fix_moves_with_prefetched_folder(mocker):
+    item = mocker.Mock()
+    item.move.return_value = {'success': True}
+    folder = {'id': 'abc', 'title': 'Water'}
+    fixer = ItemFixer(item, {'folder_fix': 'Y', 'folder_new': 'Water'})
+
+    fixer.folder_fix({'Water': folder})
+
+    item.move.assert_called_once_with(folder)
+    assert fixer.item_report['folder_result'] == "Item moved to 'Water' folder"
+
+
+def test_folder_fix_reports_missing_prefetched_folder(mocker):
+    item = mocker.Mock()
+    fixer = ItemFixer(item, {'folder_fix': 'Y', 'folder_new': 'Water'})
+
+    fixer.folder_fix({})
+
+    item.move.assert_not_called()
+    assert fixer.item_report['folder_result'] == "'Water' folder not found"
+
+
+def test_tags_and_title_matching_item_not_updated(mocker):
+    item = mocker.Mock()
+    item.tags = ['Foo']
+    item.title = 'Bar'
+    fixer = ItemFixer(item, {'tags_new': ['Foo'], 'title_new': 'Bar'})
+
+    fixer.tags_fix()
+    fixer.title_fix()
+    fixer.update_item_properties()
+
+    item.update.assert_not_called()
+    assert fixer.item_report['tags_result'] == 'No update needed for tags'
+    assert fixer.item_report['title_result'] == 'No update needed for title'
+
+
+def test_downloads_fix_skips_update_when_extract_already_enabled(mocker):
+    mock_manager = mocker.Mock()
+    mock_manager.properties = {'capabilities': 'Query, Extract'}
+    mocker.patch('arcgis.features.FeatureLayerCollection.fromitem', return_value=mocker.Mock(manager=mock_manager))
+
+    fixer = ItemFixer(mocker.Mock(), {'downloads_fix': 'Y'})
+    fixer.downloads_fix()
+
+    mock_manager.update_definition.assert_not_called()
+    assert fixer.item_report['downloads_result'] == 'No update needed for downloads'
+
+
+def test_authoritative_fix_doesnt_need_new_value_when_skipped(mocker):
+    fixer = ItemFixer(mocker.Mock(), {'authoritative_fix': 'N'})
+
+    fixer.authoritative_fix()
+
+    assert fixer.item_report['authoritative_result'] == 'No update needed for content status'
+
+
+def test_group_fix_matches_group_title_case_insensitively(mocker):
+    item = mocker.Mock()
+    group = mocker.Mock()
+    group.title = 'Utah SGID Water'
+    fixer = ItemFixer(item, {'groups_fix': 'Y', 'group_new': 'Utah SGID WATER'})
+
+    fixer.group_fix({'utah sgid water': group})
+
+    item.sharing.groups.add.assert_called_once_with(group)
+    assert fixer.item_report['groups_result'].endswith("Shared with group 'Utah SGID Water'")
+
+
+def test_metadata_fix_skips_upload_of_too_long_metadata(mocker, tmp_path):
+    _patch_metadata_export(mocker, tmp_path, 'x' * 32768)
+    item = mocker.Mock()
+    item.itemid = 'foo'
+    fixer = ItemFixer(item, {'metadata_fix': 'Y', 'metadata_new': 'bar'})
+
+    fixer.metadata_fix('template.xslt')
+
+    item.update.assert_not_called()
+    assert fixer.item_report['metadata_result'] == (
+        "Metadata too long to upload from 'bar' (32,768 > 32,767 characters)"
+    )